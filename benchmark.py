@@ -0,0 +1,237 @@
+# redskins_dashboard/jobs/benchmark.py
+#
+# Benchmarks the job2 transforms and job4 on synthetic data
+# (synthetic_data.py) at several scales.
+#
+# For every scale the raw snapshots are generated in a temporary directory
+# and the jobs are pointed at it (their RAW_DIR / PROCESSED_DIR), so the real
+# data/ folder is never touched. Each case is timed `repeat` times with a
+# cold raw table cache (loading the snapshots is part of every transform),
+# then run once more under tracemalloc for its peak Python-side memory
+# (allocations made by pyarrow itself are not seen by tracemalloc).
+#
+# One JSON line per case and scale is appended to the results file, tagged
+# with the git revision, so runs of different versions can be compared;
+# the printed table shows the change against the previous run of the same
+# case, scale and seed.
+#
+#   python -m redskins_dashboard.jobs.benchmark [--scales 1000 10000 ...]
+#       [--seed S] [--repeat N] [--cases estado ...] [--results PATH]
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+from redskins_dashboard.jobs import raw_tables
+from redskins_dashboard.jobs import job2_transform_local as job2
+from redskins_dashboard.jobs import job4_resumen_cobros as job4
+from redskins_dashboard.jobs.synthetic_data import generate
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+RESULTS_PATH = os.path.join(DATA_DIR, "benchmarks", "benchmarks.jsonl")
+
+DEFAULT_SCALES = [1_000, 10_000, 100_000, 1_000_000]
+
+# name -> transform, in run order (creditos_resumen reads the estado_general
+# view written just before it, job4 the cobros and estado_general views)
+CASES = {
+    "job2.cobros": job2.transform_cobros,
+    "job2.creditos": job2.transform_creditos,
+    "job2.estado_general": partial(job2.transform_estado_general, full_rebuild=True),
+    "job2.estado_general.incremental": job2.transform_estado_general,
+    "job2.creditos_resumen": job2.transform_creditos_resumen,
+    "job2.jugadores_dates": job2.transform_jugadores_dates,
+    "job2.categorias": job2.transform_categorias,
+    "job4": job4.main,
+}
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+@contextmanager
+def _data_dirs(raw_dir: str, processed_dir: str):
+    """Point the raw loader, job2 and job4 at other data directories."""
+    saved = (
+        raw_tables.RAW_DIR,
+        job2.RAW_DIR, job2.PROCESSED_DIR, job2.ESTADO_STATE_PATH,
+        job4.PROCESSED_DIR, job4.out_path, job4.cubo_path,
+    )
+    raw_tables.RAW_DIR = raw_dir
+    job2.RAW_DIR = raw_dir
+    job2.PROCESSED_DIR = processed_dir
+    job2.ESTADO_STATE_PATH = os.path.join(processed_dir, "estado_general_state.pkl")
+    job4.PROCESSED_DIR = Path(processed_dir)
+    job4.out_path = Path(processed_dir) / "cobros_resumen_mes_categoria.csv"
+    job4.cubo_path = Path(processed_dir) / "cobros_cubo_view.csv"
+    raw_tables.clear_raw_cache()
+    try:
+        yield
+    finally:
+        (
+            raw_tables.RAW_DIR,
+            job2.RAW_DIR, job2.PROCESSED_DIR, job2.ESTADO_STATE_PATH,
+            job4.PROCESSED_DIR, job4.out_path, job4.cubo_path,
+        ) = saved
+        raw_tables.clear_raw_cache()
+
+
+def _run_quiet(func):
+    raw_tables.clear_raw_cache()
+    with redirect_stdout(io.StringIO()):
+        return func()
+
+
+def measure(func, repeat: int = 3) -> dict:
+    """Best / median wall time over `repeat` runs, traced peak memory and output rows."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = _run_quiet(func)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        _run_quiet(func)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "rows": len(result) if result is not None else None,
+        "seconds_min": round(min(times), 4),
+        "seconds_median": round(statistics.median(times), 4),
+        "peak_mib": round(peak / 2**20, 2),
+    }
+
+
+def _load_results(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _append_results(path: str, records: list) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def run_benchmarks(scales=DEFAULT_SCALES, seed: int = 0, repeat: int = 3,
+                   cases=None, results_path: str = RESULTS_PATH) -> list:
+    """
+    Run the selected cases (all of CASES by default; names may be given by
+    prefix, e.g. "job2.estado") at every scale, append the records to
+    results_path and return them.
+    """
+    selected = [
+        name for name in CASES
+        if cases is None or any(name == c or name.startswith(c) for c in cases)
+    ]
+    previous = _load_results(results_path)
+    run = {
+        "run_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_rev": _git_revision(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "compact_memory": job2.COMPACT_MEMORY,
+        "seed": seed,
+        "repeat": repeat,
+    }
+
+    records = []
+    print(f"{'case':<34} {'cobros':>9} {'rows':>9} {'best s':>9} {'peak MiB':>9}  vs previous")
+    for scale in scales:
+        tmp_dir = tempfile.mkdtemp(prefix=f"bench_{scale}_")
+        try:
+            raw_dir = os.path.join(tmp_dir, "raw")
+            processed_dir = os.path.join(tmp_dir, "processed")
+            os.makedirs(processed_dir)
+            generate(raw_dir, scale, seed)
+
+            with _data_dirs(raw_dir, processed_dir):
+                for name in selected:
+                    record = {**run, "case": name, "cobros": scale, **measure(CASES[name], repeat)}
+                    records.append(record)
+                    _append_results(results_path, [record])
+
+                    last = next(
+                        (r for r in reversed(previous)
+                         if r["case"] == name and r["cobros"] == scale and r["seed"] == seed),
+                        None,
+                    )
+                    change = ""
+                    if last and last["seconds_min"]:
+                        change = (
+                            f"{record['seconds_min'] / last['seconds_min']:.2f}x time"
+                            f" ({last.get('git_rev')})"
+                        )
+                    print(
+                        f"{name:<34} {scale:>9} {record['rows'] or 0:>9} "
+                        f"{record['seconds_min']:>9.3f} {record['peak_mib']:>9.1f}  {change}"
+                    )
+                    sys.stdout.flush()
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"✔ {len(records)} results appended to {results_path}")
+    return records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the job2 transforms and job4 on synthetic data.")
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SCALES,
+        help="numbers of cobros to generate (default: %(default)s)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="generator seed (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (default: %(default)s)")
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        default=None,
+        help=f"cases to run, by name or prefix (default: all of {', '.join(CASES)})",
+    )
+    parser.add_argument(
+        "--results",
+        default=RESULTS_PATH,
+        help="JSON-lines file the results are appended to (default: %(default)s)",
+    )
+    args = parser.parse_args()
+    run_benchmarks(
+        scales=args.scales,
+        seed=args.seed,
+        repeat=args.repeat,
+        cases=args.cases,
+        results_path=args.results,
+    )
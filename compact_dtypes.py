@@ -0,0 +1,90 @@
+# redskins_dashboard/jobs/compact_dtypes.py
+#
+# Smaller in-memory dtypes for the job2 tables (compact-memory mode).
+#
+# - low-cardinality text repeated on every cobro / cuota row (categoria,
+#   emailAdministrador, Item Type, nombreJugador, the estado labels...)
+#   becomes categorical
+# - other text becomes the pyarrow-backed string dtype (NaN for missing, like
+#   plain object / str columns)
+# - 64-bit integers that fit become 32-bit; floats are never downcast, so
+#   amounts keep their exact values
+#
+# Values are unchanged: the CSV a compacted frame writes is byte-identical.
+# Categoricals only accept their own categories as values, so frames are
+# compacted where nothing assigns new labels into them afterwards.
+
+import importlib.util
+import numpy as np
+import pandas as pd
+
+# A text column becomes categorical if it has at most this many distinct
+# values per row (otherwise the categories cost more than they save)
+MAX_CATEGORY_RATIO = 0.5
+
+_INT32 = np.iinfo(np.int32)
+
+
+def _string_dtype():
+    """pyarrow-backed strings with NaN as missing value, None if unavailable."""
+    if importlib.util.find_spec("pyarrow") is None:
+        return None
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)
+    except TypeError:  # pandas < 2.3
+        return None
+
+
+STRING_DTYPE = _string_dtype()
+
+
+def frame_memory(df: pd.DataFrame) -> int:
+    """Bytes used by df, including the contents of string columns."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _is_text(s: pd.Series) -> bool:
+    if isinstance(s.dtype, pd.StringDtype):
+        return True
+    return s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) in ("string", "empty")
+
+
+def _downcast_int(s: pd.Series) -> pd.Series:
+    if s.dtype.itemsize != 8:
+        return s
+    lo, hi = s.min(), s.max()
+    if pd.isna(lo) or (lo >= _INT32.min and hi <= _INT32.max):
+        return s.astype("Int32" if isinstance(s.dtype, pd.Int64Dtype) else "int32")
+    return s
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of df with the compact dtypes described above."""
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(s.dtype):
+            pass
+        elif pd.api.types.is_integer_dtype(s.dtype):
+            s = _downcast_int(s)
+        elif _is_text(s):
+            if len(s) and s.nunique() <= MAX_CATEGORY_RATIO * len(s):
+                s = s.astype("category")
+            elif STRING_DTYPE is not None and s.dtype != STRING_DTYPE:
+                s = s.astype(STRING_DTYPE)
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def expand_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    df with its categorical columns turned back into plain columns, for code
+    that fills or assigns values that are not existing categories.
+    """
+    cats = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    if not cats:
+        return df
+    df = df.copy()
+    for col in cats:
+        df[col] = df[col].astype(df[col].cat.categories.dtype)
+    return df
@@ -0,0 +1,59 @@
+# redskins_dashboard/jobs/date_utils.py
+#
+# Vectorized parsing of the date values SharePoint / Graph hand us.
+#
+# Graph returns dateTime columns as ISO 8601 UTC strings
+# ('2025-10-01T07:00:00Z'). Some lists also carry a truncated form with a
+# dangling colon ('2025-10-01T07:00:'), and once a snapshot went through a
+# CSV or Parquet file the value may already be a datetime. Both helpers
+# take a whole column and parse it with an explicit format: no per-cell
+# calls and no format inference. format_sharepoint_datetime writes a
+# parsed column back in Graph's form, for views that publish it as-is.
+
+import pandas as pd
+
+def _strip_tz(series: pd.Series) -> pd.Series:
+    """tz-aware -> tz-naive UTC; tz-naive values are left as they are."""
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        return series.dt.tz_convert("UTC").dt.tz_localize(None)
+    return series
+
+
+def parse_sharepoint_datetime(series: pd.Series) -> pd.Series:
+    """
+    Parse a SharePoint dateTime column to tz-naive UTC datetimes.
+
+    Strings are read as ISO 8601 (offsets converted to UTC, a trailing ':'
+    dropped); anything unparseable becomes NaT. Datetime columns are only
+    converted to tz-naive UTC.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return _strip_tz(series)
+
+    text = series.astype("string").str.strip().str.rstrip(":")
+    parsed = pd.to_datetime(text, format="ISO8601", utc=True, errors="coerce")
+    return pd.Series(parsed, index=series.index, name=series.name).dt.tz_localize(None)
+
+
+def parse_sharepoint_date(series: pd.Series) -> pd.Series:
+    """
+    Calendar date of a SharePoint date / dateTime column, as datetimes at
+    midnight (NaT when there is no 'YYYY-MM-DD' to read).
+
+    For strings this is the date written before the 'T', without any
+    timezone shift, e.g. '2025-10-01T07:00:' -> 2025-10-01.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return _strip_tz(series).dt.normalize()
+
+    text = series.astype("string").str.strip().str.slice(0, 10)
+    return pd.to_datetime(text, format="%Y-%m-%d", errors="coerce")
+
+
+def format_sharepoint_datetime(series: pd.Series) -> pd.Series:
+    """
+    A SharePoint dateTime column back as Graph's ISO 8601 UTC strings, e.g.
+    '2025-10-01T07:00:00Z' (tz-naive datetimes are taken as UTC); missing or
+    unparseable values stay missing.
+    """
+    return parse_sharepoint_datetime(series).dt.strftime("%Y-%m-%dT%H:%M:%SZ")
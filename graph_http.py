@@ -0,0 +1,198 @@
+# redskins_dashboard/jobs/graph_http.py
+#
+# Shared Microsoft Graph request layer for job1 (list ingestion) and job3
+# (file uploads).
+#
+# - one pooled keep-alive requests.Session for every call
+# - throttled / unavailable responses (429, 503, 504) and connection errors
+#   are retried, honoring Retry-After when Graph sends it (capped at
+#   MAX_RETRY_AFTER) and using jittered exponential backoff otherwise
+# - the number of requests in flight is adapted to throttling (AIMD): it
+#   grows slowly while requests succeed and is halved when Graph throttles,
+#   so the parallel jobs settle at the throughput SharePoint allows
+
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Overridable so the jobs can be run against a local stand-in Graph server
+GRAPH = os.environ.get("GRAPH_BASE_URL", "https://graph.microsoft.com/v1.0")
+
+RETRY_STATUSES = {429, 503, 504}
+MAX_RETRIES    = int(os.environ.get("GRAPH_MAX_RETRIES", "8"))
+BACKOFF_BASE   = 1.0   # seconds
+BACKOFF_CAP    = 60.0  # seconds
+# Longest Retry-After honoured; a larger (or bogus) header waits this long
+MAX_RETRY_AFTER = float(os.environ.get("GRAPH_MAX_RETRY_AFTER", "120"))  # seconds
+
+# Bounds of the adaptive in-flight limit
+INITIAL_IN_FLIGHT = int(os.environ.get("GRAPH_INITIAL_IN_FLIGHT", "8"))
+MAX_IN_FLIGHT     = int(os.environ.get("GRAPH_MAX_IN_FLIGHT", "16"))
+
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_IN_FLIGHT))
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_IN_FLIGHT))
+
+
+class AdaptiveLimiter:
+    """
+    Caps concurrent requests with an additive-increase / multiplicative-
+    decrease limit: +1 per `limit` successful requests, halved on throttle.
+
+    A burst of throttled responses to requests that were already in flight
+    when the limit was last cut only counts once.
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 16):
+        self.minimum = minimum
+        self.maximum = maximum
+        self._limit = float(max(minimum, min(initial, maximum)))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to pass to on_throttle."""
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+            return time.monotonic()
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        with self._cond:
+            if self._limit < self.maximum:
+                self._limit = min(self.maximum, self._limit + 1.0 / self._limit)
+                self._cond.notify_all()
+
+    def on_throttle(self, started: float) -> None:
+        with self._cond:
+            if started < self._last_decrease:
+                return
+            self._limit = max(float(self.minimum), self._limit / 2)
+            self._last_decrease = time.monotonic()
+
+
+limiter = AdaptiveLimiter(INITIAL_IN_FLIGHT, maximum=MAX_IN_FLIGHT)
+
+# Counters for the current process (see stats())
+_STATS = {"requests": 0, "retries": 0, "throttled": 0, "bytes_sent": 0, "bytes_received": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(**deltas) -> None:
+    with _stats_lock:
+        for key, n in deltas.items():
+            _STATS[key] += n
+
+
+def stats() -> dict:
+    """Requests sent, retries, throttled responses and bytes so far, plus the current limit."""
+    with _stats_lock:
+        return {**_STATS, "in_flight_limit": limiter.limit}
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        for key in _STATS:
+            _STATS[key] = 0
+
+
+def _retry_after(resp: requests.Response):
+    """
+    Seconds requested by a Retry-After header (delta-seconds or HTTP date),
+    at most MAX_RETRY_AFTER, or None.
+    """
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            delay = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(0.0, delay), MAX_RETRY_AFTER)
+
+
+def _body_size(data) -> int:
+    """Bytes of a request body given as bytes or as a file object (from its position)."""
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if hasattr(data, "fileno") and hasattr(data, "tell"):
+        return os.fstat(data.fileno()).st_size - data.tell()
+    return 0
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def request(method: str, url: str, token: str = None, headers: dict = None,
+            **kwargs) -> requests.Response:
+    """
+    Sends a Graph request through the shared session and limiter.
+
+    Throttled (429) and unavailable (503/504) responses and connection
+    errors are retried up to MAX_RETRIES times. The last response is
+    returned as-is, so callers keep handling error statuses themselves.
+    A file object passed as `data` is rewound before each retry.
+    """
+    headers = dict(headers or {})
+    if token is not None:
+        headers["Authorization"] = f"Bearer {token}"
+
+    data = kwargs.get("data")
+    rewind_to = data.tell() if hasattr(data, "seek") else None
+
+    attempt = 0
+    while True:
+        if attempt and rewind_to is not None:
+            data.seek(rewind_to)
+
+        started = limiter.acquire()
+        try:
+            _count(requests=1, bytes_sent=_body_size(data))
+            resp = _session.request(method, url, headers=headers, **kwargs)
+            _count(bytes_received=len(resp.content))
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= MAX_RETRIES:
+                raise
+            delay = _backoff(attempt)
+        else:
+            if resp.status_code not in RETRY_STATUSES:
+                limiter.on_success()
+                return resp
+            _count(throttled=1)
+            limiter.on_throttle(started)
+            if attempt >= MAX_RETRIES:
+                return resp
+            delay = _retry_after(resp)
+            if delay is None:
+                delay = _backoff(attempt)
+        finally:
+            limiter.release()
+
+        _count(retries=1)
+        attempt += 1
+        time.sleep(delay)
+
+
+def get(url: str, token: str = None, **kwargs) -> requests.Response:
+    return request("GET", url, token, **kwargs)
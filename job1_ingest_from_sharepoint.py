@@ -1,21 +1,46 @@
 # job1_ingest_from_sharepoint.py
 
 import os
+import json
+import shutil
+import argparse
+import tempfile
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from urllib.parse import quote
+
 import pandas as pd
+import requests
 from redskins_dashboard.sp_client import (
     get_app_token,
-    get_site_id,
-    get_list_id,
-    read_list,
     SP_HOST,
     SITE_PATH,
 )
+from redskins_dashboard.jobs import graph_http, profiling, run_metrics
+from redskins_dashboard.jobs.graph_http import GRAPH
+from redskins_dashboard.jobs.raw_tables import (
+    RAW_TABLES,
+    apply_schema,
+    canonical_id,
+    raw_base_path,
+    read_snapshot,
+    write_snapshot,
+    write_snapshot_frames,
+)
 
 # Directory where raw snapshots will be stored
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # stripe_test/
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 
+# Per-list delta tokens for incremental ingestion
+STATE_DIR = os.path.join(BASE_DIR, "data", "state")
+
 os.makedirs(RAW_DIR, exist_ok=True)
+os.makedirs(STATE_DIR, exist_ok=True)
+
+# How many lists are downloaded at the same time
+DEFAULT_MAX_WORKERS = int(os.environ.get("JOB1_MAX_WORKERS", "4"))
 
 # SharePoint list display names (as they appear in SharePoint)
 JUGADORES_LIST_NAME  = "Jugadores"
@@ -23,33 +48,394 @@ COBROS_LIST_NAME     = "Cobros"
 CATEGORIAS_LIST_NAME = "Categorias"
 CREDITOS_LIST_NAME   = "Creditos"
 
+# Raw lists that job3 uploads as CSV for Power BI; the others are only
+# consumed by job2/job4 and get a CSV only when Parquet is not available.
+CSV_UPLOADED_TABLES = {"jugadores", "categorias"}
+
+# (SharePoint list, raw table) pairs ingested by job1
+RAW_LISTS = [
+    (JUGADORES_LIST_NAME,  "jugadores"),
+    (COBROS_LIST_NAME,     "cobros"),
+    (CATEGORIAS_LIST_NAME, "categorias"),
+    (CREDITOS_LIST_NAME,   "creditos"),
+]
+
+def _graph_get(url: str, token: str) -> requests.Response:
+    # shared pooled session, retries throttled requests (see graph_http)
+    return graph_http.get(url, token)
+
+
+def _graph_json(url: str, token: str) -> dict:
+    resp = _graph_get(url, token)
+    if resp.status_code >= 400:
+        raise RuntimeError(
+            f"Graph request failed: {resp.status_code} {resp.reason}\n{resp.text}"
+        )
+    return resp.json()
+
+
+def resolve_site_id(token: str, host: str = SP_HOST, site_path: str = SITE_PATH) -> str:
+    """Resolve the site id from its host and path, through GRAPH like every other call."""
+    url = f"{GRAPH}/sites/{host}:/sites{site_path}?$select=id"
+    return _graph_json(url, token)["id"]
+
+
+def get_list_id(site_id: str, list_display_name: str, token: str) -> str:
+    """Resolve a list id from its display name (Graph accepts the title as key)."""
+    url = f"{GRAPH}/sites/{site_id}/lists/{quote(list_display_name)}?$select=id"
+    return _graph_json(url, token)["id"]
+
+
+def _iter_item_pages(site_id: str, list_id: str, token: str):
+    """Yield the items of a list one Graph page at a time, as lists of field dicts."""
+    url = f"{GRAPH}/sites/{site_id}/lists/{list_id}/items?expand=fields&$top=999"
+    while url:
+        payload = _graph_json(url, token)
+        page = [item.get("fields", {}) for item in payload.get("value", [])]
+        run_metrics.add(rows_in=len(page))
+        yield page
+        url = payload.get("@odata.nextLink")
+
+
+def read_list(site_id: str, list_id: str, token: str) -> pd.DataFrame:
+    """Read every item of a list (all fields), following Graph pagination."""
+    rows = []
+    for page in _iter_item_pages(site_id, list_id, token):
+        rows.extend(page)
+    return pd.DataFrame(rows)
+
+
+def write_list_snapshot(table_name: str, df: pd.DataFrame) -> None:
+    """
+    Writes the raw snapshot of a list to RAW_DIR:
+
+    - <table>_raw.parquet : typed columnar snapshot (when pyarrow is installed)
+    - <table>_raw.csv     : for lists uploaded by job3, or as fallback
+
+    The CSV of an uploaded list is written first, so the Parquet is the
+    newer file and is the one load_raw reads.
+    """
+    base_path = raw_base_path(table_name)
+    output_path = os.path.join(RAW_DIR, RAW_TABLES[table_name]["file"])
+
+    def write_csv():
+        df.to_csv(output_path, index=False)
+        run_metrics.add(bytes_written=run_metrics.file_size(output_path))
+        print(f"  -> {output_path} ({len(df)} rows)")
+
+    if table_name in CSV_UPLOADED_TABLES:
+        write_csv()
+    parquet_path = write_snapshot(apply_schema(table_name, df.copy()), base_path)
+    if parquet_path:
+        print(f"  -> {parquet_path} ({len(df)} rows)")
+    elif table_name not in CSV_UPLOADED_TABLES:
+        write_csv()
+    run_metrics.add(rows_out=len(df))
 
-def dump_list_to_csv(site_id: str, token: str, list_display_name: str,
-                     output_filename: str):
+
+# ----------------------------------------------------
+# Streaming export (page by page)
+# ----------------------------------------------------
+
+def stream_list_snapshot(table_name: str, pages) -> int:
     """
-    Reads a SharePoint list (all columns) and writes it to a CSV in RAW_DIR.
+    Same outputs as write_list_snapshot, but built from an iterator of
+    Graph pages (lists of field dicts) without ever holding the whole list.
+
+    Each page is spooled to disk as soon as it arrives. Columns can appear
+    or disappear between pages (SharePoint omits empty fields), so the
+    header is only known at the end: the outputs are then written page by
+    page against the union of all columns, as CSV appends and Parquet row
+    groups. Memory stays at about one page whatever the size of the list.
+
+    Returns the number of rows written.
     """
+    spool_dir = tempfile.mkdtemp(prefix=f".{table_name}_pages_", dir=RAW_DIR)
+    try:
+        part_paths = []
+        columns = {}  # union of columns, in order of first appearance
+        n_rows = 0
+        for page in pages:
+            if not page:
+                continue
+            df_page = pd.DataFrame(page)
+            columns.update(dict.fromkeys(df_page.columns))
+            part_path = os.path.join(spool_dir, f"{len(part_paths):06d}.pkl")
+            df_page.to_pickle(part_path)
+            part_paths.append(part_path)
+            n_rows += len(df_page)
+        columns = list(columns)
+
+        def raw_pages():
+            for part_path in part_paths:
+                yield pd.read_pickle(part_path).reindex(columns=columns)
+
+        def typed_pages():
+            for df_page in raw_pages():
+                yield apply_schema(table_name, df_page)
+
+        output_path = os.path.join(RAW_DIR, RAW_TABLES[table_name]["file"])
+
+        def write_csv():
+            tmp_path = output_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                if not part_paths:
+                    pd.DataFrame().to_csv(f, index=False)
+                for i, df_page in enumerate(raw_pages()):
+                    df_page.to_csv(f, header=(i == 0), index=False)
+            os.replace(tmp_path, output_path)
+            run_metrics.add(bytes_written=run_metrics.file_size(output_path))
+            print(f"  -> {output_path} ({n_rows} rows)")
+
+        # CSV first, as in write_list_snapshot: the Parquet must be the newer file
+        if table_name in CSV_UPLOADED_TABLES:
+            write_csv()
+        base_path = raw_base_path(table_name)
+        parquet_path = write_snapshot_frames(typed_pages, base_path) if part_paths else None
+        if parquet_path:
+            print(f"  -> {parquet_path} ({n_rows} rows)")
+        elif table_name not in CSV_UPLOADED_TABLES:
+            write_csv()
+    finally:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
+    run_metrics.add(rows_out=n_rows)
+    return n_rows
+
+
+# ----------------------------------------------------
+# Incremental (delta) ingestion
+# ----------------------------------------------------
+
+class DeltaTokenExpired(Exception):
+    """Graph no longer accepts the stored delta link (HTTP 410)."""
+
+
+def _delta_state_path(table_name: str) -> str:
+    return os.path.join(STATE_DIR, f"{table_name}_delta.json")
+
+
+def _load_delta_link(table_name: str):
+    path = _delta_state_path(table_name)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("deltaLink")
+
+
+def _save_delta_link(table_name: str, delta_link: str) -> None:
+    path = _delta_state_path(table_name)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"deltaLink": delta_link, "updated": datetime.now().isoformat(timespec="seconds")},
+            f,
+        )
+    os.replace(tmp_path, path)
+
+
+def _read_delta(url: str, token: str):
+    """
+    Follows a listItem delta query to the end.
+
+    Returns (items, delta_link): every changed / deleted item returned by
+    Graph, and the deltaLink to use on the next run.
+    """
+    items = []
+    while url:
+        resp = _graph_get(url, token)
+        if resp.status_code == 410:
+            raise DeltaTokenExpired(resp.text)
+        if resp.status_code >= 400:
+            raise RuntimeError(
+                f"Delta query failed: {resp.status_code} {resp.reason}\n{resp.text}"
+            )
+
+        payload = resp.json()
+        items.extend(payload.get("value", []))
+        run_metrics.add(rows_in=len(payload.get("value", [])))
+        url = payload.get("@odata.nextLink")
+        delta_link = payload.get("@odata.deltaLink")
+
+    return items, delta_link
+
+
+def _latest_delta_link(site_id: str, list_id: str, token: str) -> str:
+    """Delta link pointing at 'now', without enumerating the list."""
+    url = f"{GRAPH}/sites/{site_id}/lists/{list_id}/items/delta?token=latest"
+    _, delta_link = _read_delta(url, token)
+    return delta_link
+
+
+def _id_key(series: pd.Series) -> pd.Series:
+    # SharePoint item ids come as strings from Graph and as numbers from the snapshots
+    return canonical_id(series)
+
+
+def _load_previous_snapshot(table_name: str):
+    """
+    Previous snapshot to merge changes into, and whether it is typed.
+
+    Lists uploaded as CSV are merged on their CSV (raw values), so the
+    uploaded file keeps the values as Graph returned them.
+    """
+    base_path = raw_base_path(table_name)
+    if table_name in CSV_UPLOADED_TABLES and os.path.exists(base_path + ".csv"):
+        run_metrics.add(bytes_read=run_metrics.file_size(base_path + ".csv"))
+        return pd.read_csv(base_path + ".csv"), False
+    return apply_schema(table_name, read_snapshot(base_path)), True
+
+
+def merge_delta(previous: pd.DataFrame, items: list, table_name: str = None) -> pd.DataFrame:
+    """
+    Applies delta items to a snapshot, matching rows by SharePoint `id`:
+    deleted items are dropped, changed / new items replace their row.
+
+    With table_name, the changed rows are typed with that table's schema
+    first (for a typed previous snapshot).
+    """
+    deleted_ids = [it["id"] for it in items if "deleted" in it]
+    changed = [
+        {**it.get("fields", {}), "id": it["id"]}
+        for it in items
+        if "deleted" not in it
+    ]
+    df_changed = pd.DataFrame(changed)
+    if table_name is not None and not df_changed.empty:
+        df_changed = apply_schema(table_name, df_changed)
+
+    touched = _id_key(pd.Series([it["id"] for it in items], dtype="object"))
+    keep = ~_id_key(previous["id"]).isin(touched)
+    merged = pd.concat([previous[keep], df_changed], ignore_index=True)
+
+    merged = merged.iloc[_id_key(merged["id"]).argsort(kind="stable")]
+    print(f"  delta: {len(df_changed)} changed, {len(deleted_ids)} deleted")
+    return merged.reset_index(drop=True)
+
+
+def sync_list_snapshot(site_id: str, token: str, list_display_name: str,
+                       table_name: str, full_refresh: bool = False,
+                       keep: bool = False):
+    """
+    Brings the raw snapshot of a list up to date.
+
+    With a stored delta link, only items changed or deleted since the last
+    run are fetched and merged into the snapshot by `id`. Otherwise (first
+    run, full_refresh, expired token) the whole list is re-read and a new
+    delta link is stored for the next run.
+
+    With keep, the up-to-date list is also returned as a DataFrame (a full
+    refresh is then read in memory instead of streamed); otherwise None.
+    """
+    delta_link = None if full_refresh else _load_delta_link(table_name)
+
+    if delta_link:
+        print(f"Reading changes of list '{list_display_name}'...")
+        try:
+            items, new_delta_link = _read_delta(delta_link, token)
+            previous, typed = _load_previous_snapshot(table_name)
+        except (DeltaTokenExpired, FileNotFoundError) as e:
+            print(f"  ! Incremental sync not possible ({type(e).__name__}), full refresh")
+        else:
+            if items:
+                previous = merge_delta(previous, items, table_name if typed else None)
+                write_list_snapshot(table_name, previous)
+            else:
+                print("  delta: no changes")
+            _save_delta_link(table_name, new_delta_link)
+            return previous if keep else None
+
+    # Full refresh: take the delta link *before* reading, so changes made
+    # while the list is being read are picked up again on the next run.
     print(f"Reading list '{list_display_name}'...")
     list_id = get_list_id(site_id, list_display_name, token)
-    df = read_list(site_id, list_id, token)  # <-- ALL columns returned by Graph
-    output_path = os.path.join(RAW_DIR, output_filename)
-    df.to_csv(output_path, index=False)
-    print(f"  -> {output_path} ({len(df)} rows)")
+    new_delta_link = _latest_delta_link(site_id, list_id, token)
+    if keep:
+        df = read_list(site_id, list_id, token)  # <-- ALL columns returned by Graph
+        write_list_snapshot(table_name, df)
+    else:
+        df = None
+        stream_list_snapshot(table_name, _iter_item_pages(site_id, list_id, token))
+    _save_delta_link(table_name, new_delta_link)
+    return df
+
+
+def ingest_lists(site_id: str, token: str, lists=RAW_LISTS,
+                 full_refresh: bool = False,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 keep: bool = False) -> dict:
+    """
+    Syncs every (list display name, table) pair concurrently, at most
+    max_workers lists at a time, all sharing the same token and HTTP pool.
+
+    Every list is attempted; if any failed, a RuntimeError listing the
+    failures is raised once all downloads have finished.
+
+    Returns {table: DataFrame} of the synced lists with keep, else {}.
+    """
+    errors = {}
+    frames = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        # each download runs in a copy of this context, so its run metrics
+        # count for the calling stage
+        futures = {
+            pool.submit(
+                contextvars.copy_context().run,
+                sync_list_snapshot, site_id, token, list_name, table_name,
+                full_refresh, keep,
+            ): (list_name, table_name)
+            for list_name, table_name in lists
+        }
+        for future in as_completed(futures):
+            list_name, table_name = futures[future]
+            try:
+                df = future.result()
+                if df is not None:
+                    frames[table_name] = df
+            except Exception as e:
+                print(f"  ✖ {list_name}: {e}")
+                errors[list_name] = e
+
+    if errors:
+        raise RuntimeError(f"Job1 failed for lists: {sorted(errors)}")
+    return frames
 
 
-def main():
+def main(full_refresh: bool = False, max_workers: int = DEFAULT_MAX_WORKERS,
+         keep: bool = False, token: str = None) -> dict:
+    """
+    Sync every list in RAW_LISTS to data/raw/. token defaults to a new app
+    token; pass one to run against a stand-in Graph server (GRAPH_BASE_URL).
+    """
     # 1) Auth & site
-    token   = get_app_token()
-    site_id = get_site_id(SP_HOST, SITE_PATH, token)
+    token   = token or get_app_token()
+    site_id = resolve_site_id(token)
 
-    # 2) Lists -> raw CSVs
-    dump_list_to_csv(site_id, token, JUGADORES_LIST_NAME,  "jugadores_raw.csv")
-    dump_list_to_csv(site_id, token, COBROS_LIST_NAME,     "cobros_raw.csv")
-    dump_list_to_csv(site_id, token, CATEGORIAS_LIST_NAME, "categorias_raw.csv")
-    dump_list_to_csv(site_id, token, CREDITOS_LIST_NAME,   "creditos_raw.csv")
+    # 2) Lists -> raw snapshots (incremental unless full_refresh), in parallel
+    frames = ingest_lists(site_id, token, RAW_LISTS, full_refresh, max_workers, keep)
 
+    http = graph_http.stats()
+    print(
+        f"Graph: {http['requests']} requests, {http['retries']} retries "
+        f"({http['throttled']} throttled), in-flight limit {http['in_flight_limit']}"
+    )
     print("Job1 complete: all raw lists exported to data/raw/.")
+    return frames
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Ingest SharePoint lists into data/raw/.")
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="re-read every list in full instead of applying delta changes",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help="number of lists downloaded concurrently (default: %(default)s)",
+    )
+    args = parser.parse_args()
+    with run_metrics.tracked_run("job1"), profiling.profiled("job1"):
+        main(full_refresh=args.full_refresh, max_workers=args.max_workers)
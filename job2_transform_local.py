@@ -1,6 +1,21 @@
 import os
+import argparse
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 
+from redskins_dashboard.jobs import profiling
+from redskins_dashboard.jobs import run_metrics
+from redskins_dashboard.jobs.compact_dtypes import compact_frame, expand_categories, frame_memory
+from redskins_dashboard.jobs.date_utils import (
+    format_sharepoint_datetime,
+    parse_sharepoint_date,
+    parse_sharepoint_datetime,
+)
+from redskins_dashboard.jobs.raw_tables import load_raw, read_snapshot, write_snapshot
+
 # Base dir = redskins_dashboard/
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # stripe_test/redskins_dashboard
 
@@ -10,17 +25,43 @@ PROCESSED_DIR = os.path.join(DATA_DIR, "processed")
 
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 
+# Parquet snapshots of the views are only needed by local consumers reading
+# them from disk; pipeline.py turns them off unless asked to checkpoint.
+SAVE_VIEW_SNAPSHOTS = True
+
+# Compact-memory mode (see compact_dtypes): the large inputs and every view
+# are kept with categorical / pyarrow string / 32-bit int dtypes. The CSVs
+# written are the same either way.
+COMPACT_MEMORY = os.environ.get("JOB2_COMPACT_MEMORY", "").lower() in ("1", "true", "yes")
+
+
+def _compact(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """df with compact dtypes when COMPACT_MEMORY is on (memory change printed)."""
+    if not COMPACT_MEMORY:
+        return df
+    before = frame_memory(df)
+    df = compact_frame(df)
+    print(f"  {name}: {before / 2**20:.2f} MiB -> {frame_memory(df) / 2**20:.2f} MiB")
+    return df
+
+
+def _save_view(df: pd.DataFrame, out_path: str) -> None:
+    """
+    Write a processed view: the CSV uploaded by job3 for Power BI, plus a
+    Parquet snapshot next to it (when available) for local consumers.
+    """
+    df.to_csv(out_path, index=False)
+    run_metrics.add(rows_out=len(df), bytes_written=run_metrics.file_size(out_path))
+    if SAVE_VIEW_SNAPSHOTS:
+        write_snapshot(df, os.path.splitext(out_path)[0])
 
-def transform_cobros() -> None:
 
-    # --- Load raw CSVs ---
-    cobros_path    = os.path.join(RAW_DIR, "cobros_raw.csv")
-    creditos_path  = os.path.join(RAW_DIR, "creditos_raw.csv")
-    jugadores_path = os.path.join(RAW_DIR, "jugadores_raw.csv")
+def transform_cobros() -> pd.DataFrame:
 
-    df_cobros    = pd.read_csv(cobros_path)
-    df_creditos  = pd.read_csv(creditos_path)
-    df_jugadores = pd.read_csv(jugadores_path)
+    # --- Load typed raw tables ---
+    df_cobros    = _compact("cobros_raw", load_raw("cobros"))
+    df_creditos  = _compact("creditos_raw", load_raw("creditos"))
+    df_jugadores = _compact("jugadores_raw", load_raw("jugadores"))
 
     # ----------------------------------------------------
     # 1. RENAME SharePoint columns to Power BI expected names
@@ -46,22 +87,15 @@ def transform_cobros() -> None:
     })
 
     # ----------------------------------------------------
-    # 2. TYPE HANDLING (safe)
+    # 2. TYPE HANDLING (numerics / dates already typed by load_raw)
     # ----------------------------------------------------
 
-    numeric_cols = ["ID", "idCredito", "montoCuota", "montoCobrado"]
-    for col in numeric_cols:
-        if col in df_cobros.columns:
-            df_cobros[col] = pd.to_numeric(df_cobros[col], errors="coerce")
-
-    for col in ["latitud", "longitud"]:
-        if col in df_cobros.columns:
-            df_cobros[col] = pd.to_numeric(df_cobros[col], errors="coerce")
-
     if "fechaCobro" in df_cobros.columns:
-        df_cobros["fechaCobro"] = pd.to_datetime(
-            df_cobros["fechaCobro"], errors="coerce"
-        ).dt.date
+        if COMPACT_MEMORY:
+            # day-precision datetimes write the same CSV as date objects
+            df_cobros["fechaCobro"] = df_cobros["fechaCobro"].dt.normalize()
+        else:
+            df_cobros["fechaCobro"] = df_cobros["fechaCobro"].dt.date
 
     # ----------------------------------------------------
     # 3. JOIN 1 — Cobros → Creditos (Credito_detalle)
@@ -109,11 +143,12 @@ def transform_cobros() -> None:
     # ----------------------------------------------------
 
     out_path = os.path.join(PROCESSED_DIR, "cobros_view.csv")
-    df_cobros.to_csv(out_path, index=False)
+    _save_view(df_cobros, out_path)
 
     print(f"✔ cobros_view.csv written to {out_path} (rows={len(df_cobros)})")
+    return _compact("cobros_view", df_cobros)
 
-def transform_creditos() -> None:
+def transform_creditos() -> pd.DataFrame:
     """
     Replicates the Power Query logic for Creditos using the raw CSV:
 
@@ -125,8 +160,7 @@ def transform_creditos() -> None:
       diaDeCobro, finalizado, Item Type, Path
     """
 
-    creditos_path = os.path.join(RAW_DIR, "creditos_raw.csv")
-    df = pd.read_csv(creditos_path)
+    df = load_raw("creditos")
 
     # --- Rename SharePoint columns to Power BI names ---
     df = df.rename(columns={
@@ -137,25 +171,7 @@ def transform_creditos() -> None:
     })
 
     # --- Type conversions (similar spirit to Table.TransformColumnTypes) ---
-
-    # Numeric columns
-    for col in ["ID", "idJugador", "montoFinanciado", "cantCuotas", "montoCuota"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    # Date
-    if "fechaInicioTemp" in df.columns:
-        s = pd.to_datetime(df["fechaInicioTemp"], errors="coerce", utc=True)
-        # strip timezone → make it tz-naive
-        try:
-            s = s.dt.tz_convert(None)
-        except TypeError:
-            try:
-                s = s.dt.tz_localize(None)
-            except TypeError:
-                pass
-        df["fechaInicioTemp"] = s
-
+    # Numeric columns and fechaInicioTemp (tz-naive) come typed from load_raw.
 
     # Boolean-ish finalizado (if string, map to True/False)
     if "finalizado" in df.columns:
@@ -211,88 +227,188 @@ def transform_creditos() -> None:
 
     # --- Save processed view ---
     out_path = os.path.join(PROCESSED_DIR, "creditos_view.csv")
-    df.to_csv(out_path, index=False)
+    _save_view(df, out_path)
     print(f"✔ creditos_view.csv written to {out_path} (rows={len(df)})")
+    return _compact("creditos_view", df)
 
 
+# Columns of a credito that the cuota schedule needs downstream
+CUOTA_KEY_COLS = ["ID", "idJugador", "nombreJugador", "montoCuota"]
 
-def transform_estado_general():
+
+def _expand_cuotas(df_credito: pd.DataFrame, dias_por_cuota: int = 21) -> pd.DataFrame:
     """
-    Replicates the entire Power BI Python block:
-    - Expands creditos into cuotas (21 days per cuota)
-    - Normalizes pagos
-    - Assigns payments to cuotas
-    - Computes estadoPago + estadoAcumulado per cuota
-    - Computes estadoGeneral por jugador
+    Expand each credito into its cuotas (one row per cuota):
+
+      nroCuota    1..cantCuotas
+      fechaInicio fechaInicioTemp + dias_por_cuota * (nroCuota - 1)
+      fechaFin    fechaInicioTemp + dias_por_cuota * nroCuota
+      rangoPago   'YYYY-MM-DD al YYYY-MM-DD'
+
+    Creditos without cantCuotas or fechaInicioTemp are skipped. Only the
+    key columns (CUOTA_KEY_COLS) are carried over to the cuotas.
     """
+    valid = df_credito["cantCuotas"].notna() & df_credito["fechaInicioTemp"].notna()
+    base = df_credito.loc[valid]
+
+    reps = base["cantCuotas"].astype("int64").clip(lower=0).to_numpy()
+    pos = np.repeat(np.arange(len(base)), reps)
+
+    # nroCuota = position of each row inside its credito block (1-based)
+    block_start = np.repeat(np.cumsum(reps) - reps, reps)
+    nro = np.arange(len(pos)) - block_start + 1
+
+    key_cols = [c for c in CUOTA_KEY_COLS if c in base.columns]
+    df_cuotas = base[key_cols].iloc[pos].reset_index(drop=True)
+    df_cuotas["nroCuota"] = nro
+
+    inicio = base["fechaInicioTemp"].iloc[pos].reset_index(drop=True)
+    df_cuotas["fechaInicio"] = inicio + pd.to_timedelta(dias_por_cuota * (nro - 1), unit="D")
+    df_cuotas["fechaFin"] = inicio + pd.to_timedelta(dias_por_cuota * nro, unit="D")
+    df_cuotas["rangoPago"] = (
+        df_cuotas["fechaInicio"].dt.strftime("%Y-%m-%d")
+        + " al "
+        + df_cuotas["fechaFin"].dt.strftime("%Y-%m-%d")
+    )
 
-    from datetime import date, timedelta
+    return df_cuotas
 
-    # =============== LOAD RAW DATA ===================
-    creditos_path = os.path.join(RAW_DIR, "creditos_raw.csv")
-    cobros_path   = os.path.join(RAW_DIR, "cobros_raw.csv")
 
-    df_credito = pd.read_csv(creditos_path)
-    df_cobros  = pd.read_csv(cobros_path)
+def _asignar_pagos(df_cuotas: pd.DataFrame, df_pagos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Assign pagos to cuotas with a sorted interval join instead of scanning
+    every pago for every cuota.
+
+    A pago belongs to a cuota of its credito when
+      fechaInicio <= fecha_pago <= fechaFin
+    (a pago falling exactly on a boundary counts for both cuotas), and the
+    last cuota of each credito also takes every pago after its fechaFin.
+
+    df_cuotas["ID"] and df_pagos["id_credito"] are the Int64 credit ids;
+    cuotas must all have one.
+
+    Returns a frame aligned to df_cuotas.index with:
+      fechaPagoReal    sorted unique 'YYYY-MM-DD' dates joined by ', ' (NA if none),
+                       kept for display only
+      sumaPagos        sum of the assigned montos (0 if none)
+      fechaPagoUltima  latest assigned fecha_pago as datetime (NaT if none)
+    """
+    cuotas = pd.DataFrame({
+        "id_credito": df_cuotas["ID"].to_numpy(dtype="int64"),
+        "nroCuota": df_cuotas["nroCuota"].to_numpy(),
+        "fechaInicio": df_cuotas["fechaInicio"].to_numpy(),
+        "fechaFin": df_cuotas["fechaFin"].to_numpy(),
+        "cuota_pos": np.arange(len(df_cuotas)),
+    })
+    cuotas["es_ultima"] = (
+        cuotas["nroCuota"] == cuotas.groupby("id_credito")["nroCuota"].transform("max")
+    )
+
+    # pagos without date never fall in a window
+    pagos = df_pagos[["id_credito", "fecha_pago", "monto"]].copy()
+    pagos["pago_pos"] = np.arange(len(pagos))
+    pagos = pagos.dropna(subset=["fecha_pago"])
+    pagos = pagos[pagos["id_credito"].isin(cuotas["id_credito"]).fillna(False)]
+    pagos["id_credito"] = pagos["id_credito"].astype("int64")
+    pagos = pagos.sort_values("fecha_pago", kind="stable")
+
+    # cuota with the latest fechaInicio <= fecha_pago (also covers the last cuota overflow)
+    desde_inicio = pd.merge_asof(
+        pagos,
+        cuotas.sort_values("fechaInicio", kind="stable"),
+        left_on="fecha_pago",
+        right_on="fechaInicio",
+        by="id_credito",
+        direction="backward",
+    )
+    desde_inicio = desde_inicio[
+        (desde_inicio["fecha_pago"] <= desde_inicio["fechaFin"]) | desde_inicio["es_ultima"].eq(True)
+    ]
 
-    # --- normalize column names (Power BI-specific) ---
-    df_credito = df_credito.rename(columns={"id": "ID"})
-    df_cobros  = df_cobros.rename(columns={"id": "ID"})
+    # cuota with the earliest fechaFin >= fecha_pago (pago on the boundary with the next cuota)
+    hasta_fin = pd.merge_asof(
+        pagos,
+        cuotas.sort_values("fechaFin", kind="stable"),
+        left_on="fecha_pago",
+        right_on="fechaFin",
+        by="id_credito",
+        direction="forward",
+    )
+    hasta_fin = hasta_fin[hasta_fin["fechaInicio"] <= hasta_fin["fecha_pago"]]
 
-    # --- Convert date columns in creditos ---
-    if "fechaInicioTemp" in df_credito.columns:
-        s = pd.to_datetime(df_credito["fechaInicioTemp"], errors="coerce", utc=True)
-        try:
-            s = s.dt.tz_convert(None)
-        except TypeError:
-            try:
-                s = s.dt.tz_localize(None)
-            except TypeError:
-                pass
-        df_credito["fechaInicioTemp"] = s
-
-    # --- Convert date columns in cobros ---
-    if "fechaCobro" in df_cobros.columns:
-        s = pd.to_datetime(df_cobros["fechaCobro"], errors="coerce", utc=True)
-        try:
-            s = s.dt.tz_convert(None)
-        except TypeError:
-            try:
-                s = s.dt.tz_localize(None)
-            except TypeError:
-                pass
-        df_cobros["fechaCobro"] = s
-
-    # --- Normalize numeric dtypes in creditos ---
-    num_cols = ["ID", "idJugador", "cantCuotas", "montoFinanciado", "montoCuota"]
-    for c in num_cols:
-        if c in df_credito.columns:
-            df_credito[c] = pd.to_numeric(df_credito[c], errors="coerce")
-
-    if "montoCobrado" in df_cobros.columns:
-        df_cobros["montoCobrado"] = pd.to_numeric(df_cobros["montoCobrado"], errors="coerce")
+    asignados = (
+        pd.concat([desde_inicio, hasta_fin], ignore_index=True)
+        .drop_duplicates(subset=["cuota_pos", "pago_pos"])
+    )
+    asignados["cuota_pos"] = asignados["cuota_pos"].astype("int64")
+
+    # same summation order as before: pagos in range first, then the
+    # overflow of the last cuota, each in the original pagos order
+    asignados["fuera"] = asignados["fecha_pago"] > asignados["fechaFin"]
+    asignados = asignados.sort_values(["cuota_pos", "fuera", "pago_pos"], kind="stable")
+
+    cuota_pos = asignados["cuota_pos"].to_numpy()
+    sumas = np.zeros(len(df_cuotas))
+    if len(asignados):
+        inicio_grupo = np.flatnonzero(np.r_[True, cuota_pos[1:] != cuota_pos[:-1]])
+        montos = asignados["monto"].fillna(0).to_numpy(dtype="float64")
+        # one reduction per cuota (np.add.reduceat associates differently
+        # and can change the last digit of the sums)
+        sumas[cuota_pos[inicio_grupo]] = [
+            grupo.sum() for grupo in np.split(montos, inicio_grupo[1:])
+        ]
 
-    # =============== EXPAND CREDITOS → CUOTAS ===================
-    filas = []
-    for _, row in df_credito.iterrows():
-        if pd.isna(row.get("cantCuotas")) or pd.isna(row.get("fechaInicioTemp")):
-            continue
+    fechas = (
+        asignados.assign(fecha_str=asignados["fecha_pago"].dt.strftime("%Y-%m-%d"))
+        .drop_duplicates(subset=["cuota_pos", "fecha_str"])
+        .sort_values(["cuota_pos", "fecha_str"], kind="stable")
+        .groupby("cuota_pos", sort=False)["fecha_str"]
+        .agg(", ".join)
+    )
 
-        n = int(row["cantCuotas"])
-        for cuota in range(1, n + 1):
-            new = row.copy()
-            new["nroCuota"] = cuota
+    fecha_pago_real = pd.Series(pd.NA, index=range(len(df_cuotas)), dtype="object")
+    fecha_pago_real[fechas.index] = fechas.to_numpy()
+
+    ultima = (
+        asignados.groupby("cuota_pos")["fecha_pago"].max()
+        .reindex(range(len(df_cuotas)))
+    )
+
+    return pd.DataFrame(
+        {
+            "fechaPagoReal": fecha_pago_real.to_numpy(),
+            "sumaPagos": sumas,
+            "fechaPagoUltima": ultima.to_numpy(),
+        },
+        index=df_cuotas.index,
+    )
 
-            ini = row["fechaInicioTemp"] + timedelta(days=21 * (cuota - 1))
-            fin = row["fechaInicioTemp"] + timedelta(days=21 * cuota)
 
-            new["fechaInicio"] = ini
-            new["fechaFin"] = fin
-            new["rangoPago"] = f"{ini.strftime('%Y-%m-%d')} al {fin.strftime('%Y-%m-%d')}"
+# Labels np.select can produce (estadoGeneral takes the estadoAcumulado ones)
+ESTADOS_PAGO = ["PAGADO", "PAGO CON MORA", "PagoAnticipado", "MOROSO", "VIGENTE"]
+ESTADOS_ACUMULADOS = ["PAGO EXCEDIDO", "DEUDA SALDADA", "AL CORRIENTE", "MOROSO"]
+
+
+def _estados(categories: list, values: np.ndarray):
+    """
+    np.select labels as a categorical with fixed categories in compact-memory
+    mode (so cached and fresh estado rows concatenate as one), as-is otherwise.
+    """
+    if not COMPACT_MEMORY:
+        return values
+    return pd.Categorical(values, categories=categories)
 
-            filas.append(new)
 
-    df_cuotas = pd.DataFrame(filas)
+def _estado_general(df_credito: pd.DataFrame, df_cobros: pd.DataFrame,
+                    hoy: pd.Timestamp) -> pd.DataFrame:
+    """
+    estadoGeneral of every jugador in df_credito (one row per idJugador,
+    sorted by it), from the cuotas of all their creditos and the cobros in
+    df_cobros, as of hoy. ID is the credit of the player's last cuota.
+    """
+    # =============== EXPAND CREDITOS → CUOTAS ===================
+    # creditos without a credit or player id never make it to the output
+    df_cuotas = _expand_cuotas(df_credito[df_credito["ID"].notna() & df_credito["idJugador"].notna()])
 
     # =============== PREP PAGO DATA ===================
     df_pagos = df_cobros[["ID", "idCredito", "fechaCobro", "montoCobrado"]].copy()
@@ -304,185 +420,326 @@ def transform_estado_general():
         "montoCobrado": "monto"
     })
 
-    # normalize fecha_pago as tz-naive datetime
-    s = pd.to_datetime(df_pagos["fecha_pago"], errors="coerce", utc=True)
-    try:
-        s = s.dt.tz_convert(None)
-    except TypeError:
-        try:
-            s = s.dt.tz_localize(None)
-        except TypeError:
-            pass
-    df_pagos["fecha_pago"] = s
+    # =============== ASSIGN PAYMENTS TO CUOTAS ===============
+    asignados = _asignar_pagos(df_cuotas, df_pagos)
+    df_cuotas["fechaPagoReal"] = asignados["fechaPagoReal"]
+    df_cuotas["sumaPagos"] = asignados["sumaPagos"]
+    df_cuotas["fechaPagoUltima"] = asignados["fechaPagoUltima"]
 
-    # normalize id_credito like original logic (.0 stripped)
-    df_pagos["id_credito"] = df_pagos["id_credito"].astype(str).str.replace(".0", "", regex=False)
+    # ensure fechaInicio / fechaFin are tz-naive datetimes
+    for col in ["fechaInicio", "fechaFin"]:
+        df_cuotas[col] = parse_sharepoint_datetime(df_cuotas[col])
 
-    # normalize df_cuotas["ID"] as string too for comparison
-    df_cuotas["ID_str"] = df_cuotas["ID"].astype(str).str.replace(".0", "", regex=False)
+    # =============== ESTADO DE PAGO ===================
+    # compare at day level, like the Power BI block
+    inicio_dia = df_cuotas["fechaInicio"].dt.normalize()
+    fin_dia    = df_cuotas["fechaFin"].dt.normalize()
+    ultima_dia = df_cuotas["fechaPagoUltima"].dt.normalize()
+    con_pago   = ultima_dia.notna()
+
+    df_cuotas["estadoPago"] = _estados(ESTADOS_PAGO, np.select(
+        [
+            # if boundaries are weird, just treat as paid
+            con_pago & (inicio_dia.isna() | fin_dia.isna()),
+            con_pago & (inicio_dia <= ultima_dia) & (ultima_dia <= fin_dia),
+            con_pago & (ultima_dia > fin_dia),
+            con_pago,
+            # no payments
+            fin_dia < hoy,
+        ],
+        ["PAGADO", "PAGADO", "PAGO CON MORA", "PagoAnticipado", "MOROSO"],
+        default="VIGENTE",
+    ))
 
-    # =============== ASSIGN PAYMENTS TO CUOTAS ===============
-    def asignar_pagos(row, pagos):
-        pagos_credito = pagos[ pagos["id_credito"] == row["ID_str"] ]
+    # =============== ACUMULADOS ===================
+    # Everything below is keyed on idJugador, so two players sharing a
+    # display name are never merged. A player's cuotas of all creditos run
+    # in nroCuota order (ties in creditos table order), like the Power BI
+    # block.
+    df_cuotas["montoCuota"] = pd.to_numeric(df_cuotas["montoCuota"], errors="coerce").fillna(0)
+    df_cuotas["sumaPagos"]  = pd.to_numeric(df_cuotas["sumaPagos"],  errors="coerce").fillna(0)
 
-        if pagos_credito.empty:
-            return pd.Series([pd.NA, 0])
+    df_cuotas = df_cuotas.sort_values(["idJugador", "nroCuota"], kind="stable").reset_index(drop=True)
+    por_jugador = df_cuotas.groupby("idJugador", sort=False)
 
-        # pagos en rango
-        dentro = pagos_credito[
-            (pagos_credito["fecha_pago"] >= row["fechaInicio"]) &
-            (pagos_credito["fecha_pago"] <= row["fechaFin"])
-        ]
+    df_cuotas["montoCuotaAcum"] = por_jugador["montoCuota"].cumsum()
+    df_cuotas["sumaPagosAcum"]  = por_jugador["sumaPagos"].cumsum()
 
-        # última cuota maneja pagos fuera de rango
-        es_ultima = row["nroCuota"] == df_cuotas[df_cuotas["ID_str"] == row["ID_str"]]["nroCuota"].max()
+    # =============== ESTADO ACUMULADO ===================
+    df_cuotas["totalCuotas"] = por_jugador["montoCuota"].transform("sum")
+    df_cuotas["totalPagado"] = por_jugador["sumaPagos"].transform("sum")
+
+    df_cuotas["estadoAcumulado"] = _estados(ESTADOS_ACUMULADOS, np.select(
+        [
+            df_cuotas["totalPagado"] > df_cuotas["totalCuotas"],
+            df_cuotas["sumaPagosAcum"] == df_cuotas["totalCuotas"],
+            df_cuotas["sumaPagosAcum"] >= df_cuotas["montoCuotaAcum"],
+        ],
+        ["PAGO EXCEDIDO", "DEUDA SALDADA", "AL CORRIENTE"],
+        default="MOROSO",
+    ))
 
-        if es_ultima:
-            fuera = pagos_credito[pagos_credito["fecha_pago"] > row["fechaFin"]]
-            pagos_final = pd.concat([dentro, fuera])
-        else:
-            pagos_final = dentro
+    # =============== ESTADO GENERAL POR JUGADOR ===================
+    df_cuotas["vencidaImpaga"] = (
+        (df_cuotas["fechaFin"].dt.normalize() < hoy)
+        & (df_cuotas["montoCuotaAcum"] > df_cuotas["sumaPagosAcum"])
+    )
+    por_jugador = df_cuotas.groupby("idJugador", sort=True)
+
+    ultima = por_jugador.nth(-1).set_index("idJugador")
+    # previous cuota when it exists, otherwise the last one
+    previa = por_jugador.nth(-2).set_index("idJugador")["estadoAcumulado"]
+    previa = previa.reindex(ultima.index).fillna(ultima["estadoAcumulado"])
+
+    vencidas = por_jugador["vencidaImpaga"].sum()
+    ultima_vigente = ultima["fechaFin"].dt.normalize() >= hoy
+
+    # the player's totals as the Power BI block sums them (one plain sum per
+    # player; the grouped sums above can differ in the last digit)
+    jugador = df_cuotas["idJugador"].to_numpy()
+    inicio_grupo = np.flatnonzero(np.r_[True, jugador[1:] != jugador[:-1]])[1:]
+
+    def total(col: str) -> list:
+        if not len(df_cuotas):
+            return []
+        return [grupo.sum() for grupo in np.split(df_cuotas[col].to_numpy(dtype="float64"), inicio_grupo)]
+
+    df_final = pd.DataFrame({
+        "idJugador": ultima.index,
+        "ID": ultima["ID"].array,
+        "nombreJugador": ultima["nombreJugador"].to_numpy(),
+        "totalCuotas": total("montoCuota"),
+        "totalPagado": total("sumaPagos"),
+    })
+    df_final["estadoGeneral"] = _estados(ESTADOS_ACUMULADOS, np.select(
+        [
+            df_final["totalPagado"] == df_final["totalCuotas"],
+            df_final["totalPagado"] > df_final["totalCuotas"],
+            ultima_vigente.to_numpy(),
+            vencidas.to_numpy() > 0,
+        ],
+        ["DEUDA SALDADA", "PAGO EXCEDIDO", previa.to_numpy(), "MOROSO"],
+        default="AL CORRIENTE",
+    ))
+
+    return df_final
+
+
+# ----------------------------------------------------
+# Incremental estado_general
+# ----------------------------------------------------
+#
+# The estado row of a player only depends on the rows of the player's
+# creditos (in table order, which breaks nroCuota ties), the cobros of
+# those creditos (in table order, which fixes the summation order) and the
+# as-of date. The state file keeps, per idJugador, a fingerprint of both
+# inputs and the last computed row, so a run only recomputes players whose
+# inputs changed or that have a cuota ending between the previous and the
+# current as-of date. Anything else that could change the result (a new
+# version of this code, different column types) discards the state.
+
+ESTADO_STATE_PATH = os.path.join(DATA_DIR, "state", "estado_general_state.pkl")
+
+# bump whenever _estado_general / _expand_cuotas / _asignar_pagos change results
+ESTADO_STATE_VERSION = 3
+
+ESTADO_CREDITO_COLS = ["ID", "idJugador", "nombreJugador", "cantCuotas", "montoCuota", "fechaInicioTemp"]
+ESTADO_COBRO_COLS = ["ID", "idCredito", "fechaCobro", "montoCobrado"]
+
+
+def _combine_hashes(keys: pd.Series, row_hashes: np.ndarray) -> pd.Series:
+    """
+    One uint64 per key combining the hashes of its rows, sensitive to the
+    order of the rows within each key. Rows with a missing key are ignored.
+    """
+    valid = keys.notna().to_numpy()
+    keys = keys[valid]
+    row_hashes = row_hashes[valid]
 
-        if pagos_final.empty:
-            return pd.Series([pd.NA, 0])
+    pos = keys.groupby(keys, sort=False).cumcount().to_numpy(dtype="uint64")
+    with np.errstate(over="ignore"):
+        mixed = pd.util.hash_array(row_hashes ^ (pos * np.uint64(0x9E3779B97F4A7C15)))
 
-        fechas = ", ".join(sorted(pagos_final["fecha_pago"].dt.strftime("%Y-%m-%d").unique()))
-        suma = pagos_final["monto"].sum()
-        return pd.Series([fechas, suma])
+    codes, uniques = pd.factorize(keys)
+    combined = np.zeros(len(uniques), dtype="uint64")
+    np.add.at(combined, codes, mixed)
+    return pd.Series(combined, index=uniques)
 
-    df_cuotas[["fechaPagoReal", "sumaPagos"]] = df_cuotas.apply(
-        lambda r: asignar_pagos(r, df_pagos),
-        axis=1
+
+def _estado_fingerprints(df_credito: pd.DataFrame, df_cobros: pd.DataFrame) -> pd.DataFrame:
+    """Per idJugador: hash of the player's credit rows (h_credito) and of their cobros (h_cobros)."""
+    h_credito = _combine_hashes(
+        df_credito["idJugador"],
+        pd.util.hash_pandas_object(df_credito[ESTADO_CREDITO_COLS], index=False).to_numpy(),
     )
 
-    # ensure fechaInicio / fechaFin are tz-naive datetimes
-    for col in ["fechaInicio", "fechaFin"]:
-        col_s = pd.to_datetime(df_cuotas[col], errors="coerce", utc=True)
-        try:
-            col_s = col_s.dt.tz_convert(None)
-        except TypeError:
-            try:
-                col_s = col_s.dt.tz_localize(None)
-            except TypeError:
-                pass
-        df_cuotas[col] = col_s
+    # a cobro counts for every player holding its credit ID, in cobros order
+    titulares = df_credito[["ID", "idJugador"]].dropna().drop_duplicates()
+    cobro_hashes = pd.util.hash_pandas_object(df_cobros[ESTADO_COBRO_COLS], index=False).to_numpy()
+    por_jugador = (
+        pd.DataFrame({"ID": df_cobros["idCredito"].to_numpy(), "pos": np.arange(len(df_cobros))})
+        .merge(titulares, on="ID")
+        .sort_values("pos", kind="stable")
+    )
+    h_cobros = _combine_hashes(
+        por_jugador["idJugador"].reset_index(drop=True),
+        cobro_hashes[por_jugador["pos"].to_numpy()],
+    )
 
-    # =============== ESTADO DE PAGO ===================
-    FECHA_HOY = date(2025, 11, 2) #date.today()
+    ids = h_credito.index
+    return pd.DataFrame(
+        {
+            "h_credito": h_credito.to_numpy(),
+            "h_cobros": h_cobros.reindex(ids, fill_value=0).to_numpy(dtype="uint64"),
+        },
+        index=ids,
+    )
 
-    def estado_pago(row):
-        # Convert fechaInicio/fechaFin to date for comparison
-        finicio = pd.to_datetime(row["fechaInicio"], errors="coerce")
-        ffin    = pd.to_datetime(row["fechaFin"], errors="coerce")
-        finicio_date = finicio.date() if not pd.isna(finicio) else None
-        ffin_date    = ffin.date() if not pd.isna(ffin) else None
-
-        if pd.notna(row["fechaPagoReal"]):
-            fechas = [pd.to_datetime(f, errors="coerce") for f in str(row["fechaPagoReal"]).split(", ")]
-            fechas = [f for f in fechas if not pd.isna(f)]
-            if not fechas:
-                # no valid payment dates parsed
-                if ffin_date is not None and ffin_date < FECHA_HOY:
-                    return "MOROSO"
-                return "VIGENTE"
-
-            ultima = max(fechas)
-            ultima_date = ultima.date()
-
-            if finicio_date is not None and ffin_date is not None:
-                if finicio_date <= ultima_date <= ffin_date:
-                    return "PAGADO"
-                elif ultima_date > ffin_date:
-                    return "PAGO CON MORA"
-                else:
-                    return "PagoAnticipado"
-            else:
-                # if boundaries are weird, just treat as paid
-                return "PAGADO"
-
-        # No payments
-        if ffin_date is not None and ffin_date < FECHA_HOY:
-            return "MOROSO"
-        return "VIGENTE"
-
-    df_cuotas["estadoPago"] = df_cuotas.apply(estado_pago, axis=1)
 
-    # =============== ACUMULADOS ===================
-    df_cuotas["montoCuota"] = pd.to_numeric(df_cuotas["montoCuota"], errors="coerce").fillna(0)
-    df_cuotas["sumaPagos"]  = pd.to_numeric(df_cuotas["sumaPagos"],  errors="coerce").fillna(0)
+def _estado_signature(df_credito: pd.DataFrame, df_cobros: pd.DataFrame) -> tuple:
+    return (
+        ESTADO_STATE_VERSION,
+        tuple(str(df_credito[c].dtype) for c in ESTADO_CREDITO_COLS),
+        tuple(str(df_cobros[c].dtype) for c in ESTADO_COBRO_COLS),
+    )
 
-    df_cuotas = df_cuotas.sort_values(["nombreJugador", "nroCuota"])
-    df_cuotas["montoCuotaAcum"] = df_cuotas.groupby("nombreJugador")["montoCuota"].cumsum()
-    df_cuotas["sumaPagosAcum"]  = df_cuotas.groupby("nombreJugador")["sumaPagos"].cumsum()
 
-    # =============== ESTADO ACUMULADO ===================
-    totales = df_cuotas.groupby("nombreJugador").agg(
-        totalCuotas=("montoCuota", "sum"),
-        totalPagado=("sumaPagos", "sum")
-    ).reset_index()
-
-    df_cuotas = df_cuotas.merge(totales, on="nombreJugador", how="left")
-
-    def estado_acumulado(row):
-        if row["totalPagado"] > row["totalCuotas"]:
-            return "PAGO EXCEDIDO"
-        elif row["sumaPagosAcum"] == row["totalCuotas"]:
-            return "DEUDA SALDADA"
-        elif row["sumaPagosAcum"] >= row["montoCuotaAcum"]:
-            return "AL CORRIENTE"
-        else:
-            return "MOROSO"
+def _load_estado_state(signature: tuple):
+    """The saved state if it was produced under the same signature, else None."""
+    if not os.path.exists(ESTADO_STATE_PATH):
+        return None
+    try:
+        state = pd.read_pickle(ESTADO_STATE_PATH)
+    except Exception as e:
+        print(f"  ! estado_general state unreadable ({e}), full rebuild")
+        return None
+    if state.get("signature") != signature:
+        return None
+    return state
 
-    df_cuotas["estadoAcumulado"] = df_cuotas.apply(estado_acumulado, axis=1)
 
-    # =============== ESTADO GENERAL POR JUGADOR ===================
-    resumen = []
+def _save_estado_state(state: dict) -> None:
+    os.makedirs(os.path.dirname(ESTADO_STATE_PATH), exist_ok=True)
+    tmp_path = ESTADO_STATE_PATH + ".tmp"
+    pd.to_pickle(state, tmp_path)
+    os.replace(tmp_path, ESTADO_STATE_PATH)
 
-    for nombre, grp in df_cuotas.groupby("nombreJugador"):
-        grp = grp.sort_values("nroCuota").copy()
 
-        total_cuotas = grp["montoCuota"].sum()
-        total_pagado = grp["sumaPagos"].sum()
+def _players_crossing(df_credito: pd.DataFrame, desde: pd.Timestamp, hasta: pd.Timestamp) -> pd.Index:
+    """idJugador of the players with a cuota ending in [min(desde, hasta), max(desde, hasta))."""
+    lo, hi = sorted([desde, hasta])
+    df_cuotas = _expand_cuotas(df_credito)
+    fin_dia = df_cuotas["fechaFin"].dt.normalize()
+    return pd.Index(df_cuotas.loc[(fin_dia >= lo) & (fin_dia < hi), "idJugador"].dropna().unique())
 
-        # compute fechaFin_date for comparisons
-        grp["fechaFin_dt"]   = pd.to_datetime(grp["fechaFin"], errors="coerce")
-        grp["fechaFin_date"] = grp["fechaFin_dt"].dt.date
 
-        ultima = grp.iloc[-1]
-        ultima_fin_date = ultima["fechaFin_date"]
-        ultima_vigente = ultima_fin_date is not None and ultima_fin_date >= FECHA_HOY
+def _estado_general_incremental(df_credito: pd.DataFrame, df_cobros: pd.DataFrame,
+                                hoy: pd.Timestamp, full_rebuild: bool = False) -> pd.DataFrame:
+    """
+    Same result as _estado_general, recomputing only the players whose
+    inputs changed since the saved state (see the section comment).
+    """
+    signature = _estado_signature(df_credito, df_cobros)
+    fingerprints = _estado_fingerprints(df_credito, df_cobros)
+    state = None if full_rebuild else _load_estado_state(signature)
 
-        if total_pagado >= total_cuotas:
-            estado_general = "DEUDA SALDADA" if total_pagado == total_cuotas else "PAGO EXCEDIDO"
+    if state is None:
+        df_final = _estado_general(df_credito, df_cobros, hoy)
+        print(f"  estado_general: full rebuild ({len(fingerprints)} players)")
+    else:
+        # compare as uint64 (a left join would turn the hashes into floats)
+        previous = state["fingerprints"]
+        known = fingerprints.index.isin(previous.index)
+        ids_known = fingerprints.index[known]
+        same = (
+            (fingerprints.loc[ids_known].to_numpy() == previous.loc[ids_known].to_numpy())
+            .all(axis=1)
+        )
+        changed = fingerprints.index[~known].union(ids_known[~same])
+        dirty = changed
+        if state["as_of"] != hoy:
+            dirty = dirty.union(_players_crossing(df_credito, state["as_of"], hoy))
+
+        cached = state["rows"]
+        cached = cached[cached["idJugador"].isin(fingerprints.index) & ~cached["idJugador"].isin(dirty)]
+
+        # dirty players without any cuota (no cantCuotas / fecha) get no row
+        dirty_credito = df_credito[df_credito["idJugador"].isin(dirty).fillna(False)]
+        con_cuotas = (
+            dirty_credito["fechaInicioTemp"].notna() & (dirty_credito["cantCuotas"] >= 1)
+        )
+        parts = [cached] if len(cached) else []
+        if con_cuotas.any():
+            parts.append(_estado_general(
+                dirty_credito,
+                df_cobros[df_cobros["idCredito"].isin(dirty_credito["ID"]).fillna(False)],
+                hoy,
+            ))
+
+        if parts:
+            df_final = (
+                pd.concat(parts, ignore_index=True)
+                .sort_values("idJugador", kind="stable")
+                .reset_index(drop=True)
+            )
         else:
-            if ultima_vigente:
-                # use previous cuota if exists
-                if len(grp) > 1:
-                    prev = grp.iloc[-2]
-                    estado_general = prev["estadoAcumulado"]
-                else:
-                    estado_general = ultima["estadoAcumulado"]
-            else:
-                vencidas = grp[
-                    (grp["fechaFin_date"] < FECHA_HOY) &
-                    (grp["montoCuotaAcum"] > grp["sumaPagosAcum"])
-                ]
-                estado_general = "MOROSO" if not vencidas.empty else "AL CORRIENTE"
+            df_final = _estado_general(df_credito, df_cobros, hoy)
+        print(
+            f"  estado_general: recomputed {len(dirty)} of {len(fingerprints)} players "
+            f"({len(changed)} changed)"
+        )
 
-        resumen.append({
-            "ID": ultima["ID"],
-            "nombreJugador": nombre,
-            "totalCuotas": total_cuotas,
-            "totalPagado": total_pagado,
-            "estadoGeneral": estado_general
-        })
+    _save_estado_state({
+        "signature": signature,
+        "as_of": hoy,
+        "fingerprints": fingerprints,
+        "rows": df_final,
+    })
+    return df_final
 
-    df_final = pd.DataFrame(resumen)
+
+def transform_estado_general(full_rebuild: bool = False) -> pd.DataFrame:
+    """
+    Replicates the entire Power BI Python block:
+    - Expands creditos into cuotas (21 days per cuota)
+    - Normalizes pagos
+    - Assigns payments to cuotas
+    - Computes estadoPago + estadoAcumulado per cuota
+    - Computes estadoGeneral per idJugador (one row per jugador, ID being
+      the credito of their last cuota)
+
+    Only players whose inputs changed since the last run are recomputed,
+    unless full_rebuild.
+    """
+
+    from datetime import date
+
+    # =============== LOAD RAW DATA ===================
+    # numerics and dates (tz-naive) already typed by load_raw
+    df_credito = load_raw("creditos", columns=[
+        "id", "idJugador", "nombreJugador", "cantCuotas", "montoCuota", "fechaInicioTemp",
+    ])
+    df_cobros  = load_raw("cobros", columns=["id", "idCredito", "fechaCobro", "montoCobrado"])
+    df_credito = _compact("creditos_raw", df_credito)
+    df_cobros  = _compact("cobros_raw", df_cobros)
+
+    # --- normalize column names (Power BI-specific) ---
+    df_credito = df_credito.rename(columns={"id": "ID"})
+    df_cobros  = df_cobros.rename(columns={"id": "ID"})
+
+    FECHA_HOY = date(2025, 11, 2) #date.today()
+
+    hoy = pd.Timestamp(FECHA_HOY)
+
+    df_final = _estado_general_incremental(df_credito, df_cobros, hoy, full_rebuild)
+    # idJugador only keys the incremental state; the view keeps the Power BI columns
+    df_final = df_final.drop(columns="idJugador")
 
     # ================= SAVE ======================
     out_path = os.path.join(PROCESSED_DIR, "estado_general_view.csv")
-    df_final.to_csv(out_path, index=False)
+    _save_view(df_final, out_path)
     print(f"✔ estado_general_view.csv written to {out_path} (rows={len(df_final)})")
+    return _compact("estado_general_view", df_final)
 
 
 
@@ -726,357 +983,161 @@ def transform_estado_general():
 #     print(f"✔ creditos_resumen_view.csv written to {out_path} (rows={len(df_final)})")
 
 
+# column order of creditos_resumen_view.csv
+CREDITOS_RESUMEN_COLUMNS = [
+    "ID", "idJugador", "nombreJugador", "articulos", "montoFinanciado",
+    "cantCuotas", "montoCuota", "fechaInicioTemp", "finalizado",
+    "montoCuota_total", "montoCobrado_total", "cantidadCobros", "totalFechasCobros",
+    "Jugador", "TutorJugador", "Categoria", "Edad", "edadEtiqueta", "estaFinalGeneral",
+    "data_jugadores.ID", "data_jugadores.nombreJugador",
+    "nombrePadreTutor", "categoria", "edad", "data_jugadores.categoria",
+]
 
 
-def transform_creditos_resumen():
+def _fechas_cobros(df_cobros: pd.DataFrame) -> pd.Series:
     """
-    Build creditos_resumen_view.csv:
-
-    - Aggregate Cobros by idCredito
-    - Join with Creditos
-    - Join with Jugadores (main info)
-    - Join with estado_general_view
-    - Full outer join with jugadores again (data_jugadores.*)
-    - Back-fill player info for players with no credit
+    totalFechasCobros by idCredito: the dates of its cobros, in cobro order,
+    as 'YYYY-MM-DD, YYYY-MM-DD, ...'.
     """
-
-    # ---------- Load raw / processed inputs ----------
-    creditos_path  = os.path.join(RAW_DIR, "creditos_raw.csv")
-    cobros_path    = os.path.join(RAW_DIR, "cobros_raw.csv")
-    jugadores_path = os.path.join(RAW_DIR, "jugadores_raw.csv")
-    estado_path    = os.path.join(PROCESSED_DIR, "estado_general_view.csv")
-
-    df_credito   = pd.read_csv(creditos_path)
-    df_cobros    = pd.read_csv(cobros_path)
-    df_jugadores = pd.read_csv(jugadores_path)
-    df_estado    = pd.read_csv(estado_path)
-
-    # ---------- Normalize ID columns ----------
-    df_credito = df_credito.rename(columns={"id": "ID"})   # credit ID
-    df_cobros  = df_cobros.rename(columns={"id": "ID"})    # cobro row ID
-
-    # idCredito in cobros -> string
-    if "idCredito" in df_cobros.columns:
-        df_cobros["idCredito"] = (
-            df_cobros["idCredito"]
-            .astype(str)
-            .str.replace(".0", "", regex=False)
-            .str.strip()
-        )
-
-    # Helper string version of creditos.ID
-    df_credito["ID_str"] = (
-        df_credito["ID"]
-        .astype(str)
-        .str.replace(".0", "", regex=False)
-        .str.strip()
+    ids, fechas = df_cobros["idCredito"], df_cobros["fechaCobro"]
+    valid = (ids.notna() & fechas.notna()).to_numpy()
+    creditos = ids.to_numpy("int64", na_value=0)[valid]
+    orden = np.argsort(creditos, kind="stable")
+    creditos = creditos[orden]
+    dias = fechas.to_numpy("datetime64[D]")[valid][orden]
+
+    # Every cobro becomes the 12 bytes "YYYY-MM-DD, " of one buffer, in
+    # credit order (each distinct day is formatted once); a credit's value is
+    # its slice of the buffer without the last ", ".
+    codes, unicos = pd.factorize(dias.view("int64"))
+    textos = np.char.add(np.datetime_as_string(unicos.astype("datetime64[D]")), ", ")
+    buf = textos.astype("S12").take(codes).tobytes()
+    nuevo = np.ones(len(creditos), dtype=bool)
+    nuevo[1:] = creditos[1:] != creditos[:-1]
+    inicio = np.flatnonzero(nuevo)
+    fin = np.r_[inicio[1:], len(creditos)]
+    return pd.Series(
+        [buf[12 * i:12 * f - 2].decode("ascii") for i, f in zip(inicio.tolist(), fin.tolist())],
+        index=creditos[inicio],
+        dtype=str,
     )
 
-    # ---------- Types in Cobros ----------
-    if "fechaCobro" in df_cobros.columns:
-        df_cobros["fechaCobro"] = pd.to_datetime(
-            df_cobros["fechaCobro"], errors="coerce"
-        )
 
-    for col in ["montoCuota", "montoCobrado"]:
-        if col in df_cobros.columns:
-            df_cobros[col] = pd.to_numeric(df_cobros[col], errors="coerce")
+def _edad_etiqueta(edad: pd.Series) -> pd.Series:
+    """'<edad>-Años' (edad truncated to an integer), NaN where edad is missing."""
+    known = edad.dropna()
+    return (known.astype("int64").astype(str) + "-Años").reindex(edad.index)
 
-    # ---------- Group Cobros by idCredito ----------
-    agg_dict = {
-        "montoCuota":   "sum",
-        "montoCobrado": "sum",
-        "ID":           "count",   # number of pagos
-    }
-    valid_agg = {k: v for k, v in agg_dict.items() if k in df_cobros.columns}
 
-    df_grouped = (
-        df_cobros.groupby("idCredito", as_index=False)
-        .agg(valid_agg)
-    )
+def transform_creditos_resumen(df_estado: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Build creditos_resumen_view.csv, one row per credit plus one per player
+    without credits:
 
-    rename_agg = {}
-    if "montoCuota" in df_grouped.columns:
-        rename_agg["montoCuota"] = "montoCuota_sum"
-    if "montoCobrado" in df_grouped.columns:
-        rename_agg["montoCobrado"] = "montoCobrado_sum"
-    if "ID" in df_grouped.columns:
-        rename_agg["ID"] = "cantidadCobros"
+    - Aggregate Cobros by idCredito (totals, count, dates)
+    - Join with Creditos and with estado_general_view (estaFinalGeneral)
+    - Full outer join with Jugadores (data_jugadores.*): the player columns
+      of credit rows (Jugador, TutorJugador, Categoria, Edad) come from it,
+      and players with no credit get estaFinalGeneral "SIN CREDITO"
 
-    df_grouped = df_grouped.rename(columns=rename_agg)
+    df_estado is the output of transform_estado_general when it ran in the
+    same process; otherwise the estado_general_view snapshot is read.
+    """
 
-    # totalFechasCobros
-    if "fechaCobro" in df_cobros.columns:
-        df_fechas = (
-            df_cobros
-            .dropna(subset=["fechaCobro"])
-            .assign(fechaCobro_str=lambda d: d["fechaCobro"].dt.strftime("%Y-%m-%d"))
-            .groupby("idCredito", as_index=False)["fechaCobro_str"]
-            .agg(lambda x: ", ".join(x))
-            .rename(columns={"fechaCobro_str": "totalFechasCobros"})
-        )
-        df_grouped = df_grouped.merge(df_fechas, on="idCredito", how="left")
-    else:
-        df_grouped["totalFechasCobros"] = pd.NA
+    # ---------- Load raw / processed inputs ----------
+    estado_path = os.path.join(PROCESSED_DIR, "estado_general_view")
 
-    # ---------- Select Creditos columns ----------
-    columnas_deseadas = [
-        "ID",
-        "idJugador",
-        "nombreJugador",
-        "articulos",
-        "montoFinanciado",
-        "cantCuotas",
-        "montoCuota",
-        "fechaInicioTemp",
-        "finalizado",
+    # missing columns are added empty; ID / idCredito / idJugador are Int64
+    # keys (canonical_id in load_raw)
+    credito_cols = [
+        "id", "idJugador", "nombreJugador", "articulos", "montoFinanciado",
+        "cantCuotas", "montoCuota", "fechaInicioTemp", "finalizado",
     ]
-    for c in columnas_deseadas:
-        if c not in df_credito.columns:
-            df_credito[c] = pd.NA
-
-    df_cred_sel = df_credito[columnas_deseadas + ["ID_str"]].copy()
-
-    # ---------- Merge Creditos + Cobros ----------
-    df_final = pd.merge(
-        df_cred_sel,
-        df_grouped,
-        left_on="ID_str",
-        right_on="idCredito",
-        how="left",
-    )
-
-    drop_cols = [c for c in ["idCredito", "ID_str"] if c in df_final.columns]
-    if drop_cols:
-        df_final = df_final.drop(columns=drop_cols)
+    cobros_cols = ["id", "idCredito", "fechaCobro", "montoCuota", "montoCobrado"]
+    jugadores_cols = ["id", "Title", "nombrePadreTutor", "categoria", "edad"]
+    df_credito   = load_raw("creditos", columns=credito_cols).reindex(columns=credito_cols)
+    df_cobros    = load_raw("cobros", columns=cobros_cols).reindex(columns=cobros_cols)
+    df_jugadores = load_raw("jugadores", columns=jugadores_cols).reindex(columns=jugadores_cols)
+    if df_estado is None:
+        df_estado = read_snapshot(estado_path, columns=["ID", "estadoGeneral"])
+    else:
+        df_estado = df_estado[["ID", "estadoGeneral"]]
+    # estadoGeneral may be categorical (compact mode); "SIN CREDITO" is filled in below
+    df_estado = expand_categories(df_estado).rename(columns={"estadoGeneral": "estaFinalGeneral"})
 
-    df_final = df_final.rename(
-        columns={
-            "montoCuota_sum": "montoCuota_total",
-            "montoCobrado_sum": "montoCobrado_total",
-        }
+    # ---------- Group Cobros by idCredito ----------
+    df_grouped = (
+        df_cobros.groupby("idCredito", as_index=False)
+        .agg(
+            montoCuota_total=("montoCuota", "sum"),
+            montoCobrado_total=("montoCobrado", "sum"),
+            cantidadCobros=("id", "count"),
+        )
     )
-
-    # ---------- Join with Jugadores (main info) ----------
-    df_jug = df_jugadores.rename(columns={"id": "ID"})
-    if "Title" in df_jug.columns:
-        df_jug = df_jug.rename(columns={"Title": "nombreJugador_Jugadores"})
-
-    jug_merge_cols = [
-        "ID",
-        "nombreJugador_Jugadores",
-        "nombrePadreTutor",
-        "categoria",
-        "edad",
-    ]
-    jug_merge_cols = [c for c in jug_merge_cols if c in df_jug.columns]
-    df_jug_sel = df_jug[jug_merge_cols].copy()
-
-    df_final = df_final.merge(
-        df_jug_sel,
-        how="left",
-        left_on="idJugador",
-        right_on="ID",
-        suffixes=("", "_jug"),
+    df_grouped["totalFechasCobros"] = df_grouped["idCredito"].map(_fechas_cobros(df_cobros))
+
+    # ---------- Creditos + Cobros + estado_general_view ----------
+    df_final = (
+        df_credito.rename(columns={"id": "ID"})
+        .merge(df_grouped, how="left", left_on="ID", right_on="idCredito")
+        .drop(columns=["idCredito"])
+        .merge(df_estado, how="left", on="ID")
     )
 
-    if "ID_jug" in df_final.columns:
-        df_final = df_final.drop(columns=["ID_jug"])
-
-    rename_jug = {}
-    if "nombreJugador_Jugadores" in df_final.columns:
-        rename_jug["nombreJugador_Jugadores"] = "Jugador"
-    if "nombrePadreTutor" in df_final.columns:
-        rename_jug["nombrePadreTutor"] = "TutorJugador"
-    if "categoria" in df_final.columns:
-        rename_jug["categoria"] = "Categoria"
-    if "edad" in df_final.columns:
-        rename_jug["edad"] = "Edad"
-
-    df_final = df_final.rename(columns=rename_jug)
-
-    # edadEtiqueta
-    if "Edad" in df_final.columns:
-        df_final["edadEtiqueta"] = df_final["Edad"].apply(
-            lambda x: f"{int(x)}-Años" if pd.notnull(x) else pd.NA
-        )
-    else:
-        df_final["edadEtiqueta"] = pd.NA
-
-    # ---------- Join with estado_general_view ----------
-    if "ID" in df_estado.columns:
-        df_final = df_final.merge(
-            df_estado[["ID", "estadoGeneral"]],
-            how="left",
-            on="ID",
-            suffixes=("", "_estado"),
-        )
-        df_final = df_final.rename(columns={"estadoGeneral": "estaFinalGeneral"})
-    else:
-        df_final["estaFinalGeneral"] = pd.NA
-
-    # ---------- Join with data_jugadores (full outer) ----------
-    df_dj = df_jugadores.rename(columns={"id": "ID"})
-    if "Title" in df_dj.columns:
-        df_dj = df_dj.rename(columns={"Title": "nombreJugador_dj"})
-
-    dj_cols = ["ID", "nombreJugador_dj", "nombrePadreTutor", "categoria", "edad"]
-    dj_cols = [c for c in dj_cols if c in df_dj.columns]
-    df_dj_sel = df_dj[dj_cols].copy()
-
+    # ---------- Full outer join with Jugadores (data_jugadores.*) ----------
     df_final = df_final.merge(
-        df_dj_sel,
+        df_jugadores.rename(columns={
+            "id": "data_jugadores.ID",
+            "Title": "data_jugadores.nombreJugador",
+        }),
         how="outer",
         left_on="idJugador",
-        right_on="ID",
-        suffixes=("", "_dj"),
-    )
-
-    # data_jugadores.*
-    if "ID_dj" in df_final.columns:
-        df_final = df_final.rename(columns={"ID_dj": "data_jugadores.ID"})
-    else:
-        df_final["data_jugadores.ID"] = pd.NA
-
-    if "nombreJugador_dj" in df_final.columns:
-        df_final = df_final.rename(
-            columns={"nombreJugador_dj": "data_jugadores.nombreJugador"}
-        )
-    else:
-        df_final["data_jugadores.nombreJugador"] = pd.NA
-
-    if "categoria_dj" in df_final.columns:
-        df_final = df_final.rename(
-            columns={"categoria_dj": "data_jugadores.categoria"}
-        )
-    else:
-        df_final["data_jugadores.categoria"] = pd.NA
-
-    # ---------- Back-fill from *_dj for all rows ----------
-    # TutorJugador / Edad helpers from right side
-    if "nombrePadreTutor_dj" in df_final.columns:
-        df_final["TutorJugador"] = df_final.get("TutorJugador", pd.NA)
-        df_final["TutorJugador"] = df_final["TutorJugador"].fillna(
-            df_final["nombrePadreTutor_dj"]
-        )
-
-    if "edad_dj" in df_final.columns:
-        df_final["Edad"] = df_final.get("Edad", pd.NA)
-        df_final["Edad"] = df_final["Edad"].fillna(df_final["edad_dj"])
-
-    # Rebuild edadEtiqueta from final Edad
-    if "Edad" in df_final.columns:
-        df_final["edadEtiqueta"] = df_final["Edad"].apply(
-            lambda x: f"{int(x)}-Años" if pd.notnull(x) else pd.NA
-        )
-
-    # ---------- Duplicate base fields (nombrePadreTutor, categoria, edad) ----------
-    # nombrePadreTutor column (besides TutorJugador)
-    df_final["nombrePadreTutor"] = df_final.get("nombrePadreTutor", pd.NA)
-    df_final["nombrePadreTutor"] = df_final["nombrePadreTutor"].fillna(
-        df_final.get("TutorJugador")
+        right_on="data_jugadores.ID",
+        indicator=True,
     )
 
-    # categoria / edad duplicates
-    df_final["Categoria"] = df_final.get("Categoria", pd.NA)
-    df_final["Edad"] = df_final.get("Edad", pd.NA)
-
-    df_final["categoria"] = df_final.get("categoria", pd.NA)
-    df_final["categoria"] = df_final["categoria"].fillna(df_final["Categoria"])
+    from_credit = df_final["_merge"] != "right_only"
+    # No credit if credit ID is null but data_jugadores.ID exists
+    mask_no_credit = df_final["ID"].isna() & df_final["data_jugadores.ID"].notna()
+    with_player = from_credit | mask_no_credit
 
-    df_final["edad"] = df_final.get("edad", pd.NA)
-    df_final["edad"] = df_final["edad"].fillna(df_final["Edad"])
+    # Player info of credit rows, and of players without credit (except Categoria)
+    df_final["Jugador"] = df_final["data_jugadores.nombreJugador"].where(with_player)
+    df_final["TutorJugador"] = df_final["nombrePadreTutor"].where(with_player)
+    df_final["Categoria"] = df_final["categoria"].where(from_credit)
+    df_final["Edad"] = df_final["edad"].where(with_player)
+    df_final["edadEtiqueta"] = _edad_etiqueta(df_final["Edad"])
 
     # nombreJugador main column: use Jugador when missing
-    df_final["Jugador"] = df_final.get("Jugador", pd.NA)
-    df_final["nombreJugador"] = df_final.get("nombreJugador", pd.NA)
     df_final["nombreJugador"] = df_final["nombreJugador"].fillna(df_final["Jugador"])
 
-    # ---------- Identify "no credit" rows ----------
-    # No credit if credit ID is null but data_jugadores.ID exists
-    mask_no_credit = df_final["ID"].isna() & df_final["data_jugadores.ID"].notna()
-
-    # For those, if idJugador is empty, map it to player ID
-    if "idJugador" in df_final.columns:
-        df_final.loc[mask_no_credit, "idJugador"] = df_final.loc[
-            mask_no_credit, "data_jugadores.ID"
-        ]
-
-    # Default estado final for no-credit players
-    df_final.loc[mask_no_credit, "estaFinalGeneral"] = df_final.loc[
-        mask_no_credit, "estaFinalGeneral"
-    ].fillna("SIN CREDITO")
-
-    # For no-credit players, also make sure all person fields are filled
-    for col, source in [
-        ("Jugador", "data_jugadores.nombreJugador"),
-        ("nombreJugador", "data_jugadores.nombreJugador"),
-        ("TutorJugador", "nombrePadreTutor"),
-        ("Categoria", "data_jugadores.categoria"),
-        ("categoria", "data_jugadores.categoria"),
-        ("Edad", "edad"),
-        ("edad", "edad"),
-    ]:
-        if col in df_final.columns and source in df_final.columns:
-            df_final.loc[mask_no_credit, col] = df_final.loc[
-                mask_no_credit, col
-            ].fillna(df_final.loc[mask_no_credit, source])
-
-    # Rebuild edadEtiqueta just in case
-    if "Edad" in df_final.columns:
-        df_final["edadEtiqueta"] = df_final["Edad"].apply(
-            lambda x: f"{int(x)}-Años" if pd.notnull(x) else pd.NA
-        )
+    # No-credit players: idJugador is the player ID, estado "SIN CREDITO"
+    df_final["idJugador"] = df_final["idJugador"].mask(mask_no_credit, df_final["data_jugadores.ID"])
+    df_final["estaFinalGeneral"] = df_final["estaFinalGeneral"].mask(
+        mask_no_credit & df_final["estaFinalGeneral"].isna(), "SIN CREDITO"
+    )
 
-    # ---------- Drop helper columns we no longer need ----------
-    for col in ["nombrePadreTutor_dj", "edad_dj"]:
-        if col in df_final.columns:
-            df_final = df_final.drop(columns=[col])
+    # kept empty for the dashboard's column mapping
+    df_final["data_jugadores.categoria"] = pd.NA
+    # published as Graph wrote it ('YYYY-MM-DDTHH:MM:SSZ'), like before the raw typing
+    df_final["fechaInicioTemp"] = format_sharepoint_datetime(df_final["fechaInicioTemp"])
+    df_final = df_final[CREDITOS_RESUMEN_COLUMNS]
 
     # ---------- Save ----------
     out_path = os.path.join(PROCESSED_DIR, "creditos_resumen_view.csv")
-    df_final.to_csv(out_path, index=False)
+    _save_view(df_final, out_path)
     print(f"✔ creditos_resumen_view.csv written to {out_path} (rows={len(df_final)})")
+    return _compact("creditos_resumen_view", df_final)
 
 
 
-def _parse_date_only(value):
-    """
-    Take a value like:
-      - '2025-10-01T07:00:'
-      - '2025-10-01T07:00:00Z'
-      - '2025-10-01'
-    and return a Python date (YYYY-MM-DD) or pd.NaT if it can't be parsed.
-    """
-    if pd.isna(value):
-        return pd.NaT
-
-    txt = str(value).strip()
-    if not txt:
-        return pd.NaT
-
-    # If looks like ISO (has 'T'), keep only part before 'T'
-    if "T" in txt:
-        txt = txt.split("T", 1)[0]
-
-    # Also trim a trailing colon if it exists (like '2025-10-01T07:00:')
-    if txt.endswith(":"):
-        txt = txt[:-1]
-
-    try:
-        return pd.to_datetime(txt, errors="raise").date()
-    except Exception:
-        return pd.NaT
-
-
-def transform_jugadores_dates() -> None:
+def transform_jugadores_dates() -> pd.DataFrame:
     """
     Clean Jugadores date-like columns from jugadores_raw.csv and
     write a jugadores_view.csv with safe YYYY-MM-DD dates.
     """
 
-    jugadores_path = os.path.join(RAW_DIR, "jugadores_raw.csv")
-    df = pd.read_csv(jugadores_path)
+    df = load_raw("jugadores")
 
     # If you want, keep same column names as raw (Power BI will still see them),
     # or you can rename here to match your existing model:
@@ -1085,24 +1146,19 @@ def transform_jugadores_dates() -> None:
     # Date-like columns we care about
     date_cols = ["apertura", "cierre", "Created", "Modified"]
 
-    for col in date_cols:
-        if col in df.columns:
-            df[col] = df[col].apply(_parse_date_only)
-
-    # Optional: cast to string 'YYYY-MM-DD' instead of Python date objects
+    # Keep only the date part, as 'YYYY-MM-DD' strings ('' when missing)
     # so Power BI treats them cleanly as dates when importing CSV:
     for col in date_cols:
         if col in df.columns:
-            df[col] = df[col].apply(
-                lambda d: d.strftime("%Y-%m-%d") if pd.notna(d) else ""
-            )
+            df[col] = parse_sharepoint_date(df[col]).dt.strftime("%Y-%m-%d").fillna("")
 
     out_path = os.path.join(PROCESSED_DIR, "jugadores_view.csv")
-    df.to_csv(out_path, index=False)
+    _save_view(df, out_path)
     print(f"✔ jugadores_view.csv written to {out_path} (rows={len(df)})")
+    return _compact("jugadores_view", df)
 
 
-def transform_categorias() -> None:
+def transform_categorias() -> pd.DataFrame:
     """
     Clean categorias_raw.csv and write categorias_view.csv
 
@@ -1114,8 +1170,7 @@ def transform_categorias() -> None:
         ID, denominacion, Item Type, Path
     """
 
-    categorias_path = os.path.join(RAW_DIR, "categorias_raw.csv")
-    df = pd.read_csv(categorias_path)
+    df = load_raw("categorias")
 
     # --- Rename SharePoint columns to PB-friendly names ---
     df = df.rename(columns={
@@ -1123,19 +1178,8 @@ def transform_categorias() -> None:
         "Title": "denominacion",
     })
 
-    # --- Fix datetime columns coming in as ISO strings ---
-    for col in ["Created", "Modified", "_ComplianceTagWrittenTime"]:
-        if col in df.columns:
-            s = pd.to_datetime(df[col], errors="coerce", utc=True)
-            # strip timezone → tz-naive
-            try:
-                s = s.dt.tz_convert(None)
-            except TypeError:
-                try:
-                    s = s.dt.tz_localize(None)
-                except TypeError:
-                    pass
-            df[col] = s
+    # --- ISO datetime columns (Created / Modified / _ComplianceTagWrittenTime)
+    # come parsed and tz-naive from load_raw ---
 
     # --- Ensure Power BI expected columns exist ---
     expected_cols = ["ID", "denominacion", "Item Type", "Path"]
@@ -1149,16 +1193,112 @@ def transform_categorias() -> None:
     df_out = df[expected_cols + other_cols]
 
     out_path = os.path.join(PROCESSED_DIR, "categorias_view.csv")
-    df_out.to_csv(out_path, index=False)
+    _save_view(df_out, out_path)
     print(f"✔ categorias_view.csv written to {out_path} (rows={len(df_out)})")
+    return _compact("categorias_view", df_out)
+
+
+def _estado_general_and_resumen(full_rebuild: bool = False):
+    # creditos_resumen needs estado_general: both run in the same worker
+    df_estado = transform_estado_general(full_rebuild)
+    return df_estado, transform_creditos_resumen(df_estado)
+
+
+def _run_in_worker(func, save_view_snapshots: bool, compact_memory: bool,
+                   profile_name: str = None):
+    """
+    func's result and the run metrics it reported (added to the parent's
+    stage). With a profile_name the worker writes its own profile.
+    """
+    global SAVE_VIEW_SNAPSHOTS, COMPACT_MEMORY
+    SAVE_VIEW_SNAPSHOTS = save_view_snapshots
+    COMPACT_MEMORY = compact_memory
+    with run_metrics.collect() as counters, \
+            profiling.profiled(profile_name, enabled=profile_name is not None):
+        result = func()
+    return result, counters
+
+
+def main(parallel: bool = False, max_workers: int = None,
+         full_rebuild: bool = False) -> dict:
+    """
+    Run every transform; returns the views by name (e.g. "cobros_view").
+
+    With parallel, the transforms run in a process pool: estado_general
+    followed by creditos_resumen (its one dependency) in one worker, and
+    each of the other four in its own. Workers are spawned, not forked:
+    a fork taken while another thread (e.g. a pipeline stage) holds a lock
+    leaves that lock held forever in the worker. Spawned workers load
+    the raw tables from the snapshots on disk.
+
+    full_rebuild recomputes estado_general for every credit instead of
+    only the ones whose inputs changed.
+    """
+    if parallel:
+        with ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            futures = {
+                name: pool.submit(
+                    _run_in_worker, func, SAVE_VIEW_SNAPSHOTS, COMPACT_MEMORY,
+                    f"job2.{name}" if profiling.ENABLED else None,
+                )
+                for name, func in [
+                    ("estado_general_view", partial(_estado_general_and_resumen, full_rebuild)),
+                    ("cobros_view", transform_cobros),
+                    ("creditos_view", transform_creditos),
+                    ("jugadores_view", transform_jugadores_dates),
+                    ("categorias_view", transform_categorias),
+                ]
+            }
+            results = {}
+            for name, future in futures.items():
+                results[name], counters = future.result()
+                run_metrics.add(**counters)
+
+        views = {}
+        views["cobros_view"] = results["cobros_view"]
+        views["creditos_view"] = results["creditos_view"]
+        views["estado_general_view"], views["creditos_resumen_view"] = results["estado_general_view"]
+        views["jugadores_view"] = results["jugadores_view"]
+        views["categorias_view"] = results["categorias_view"]
+        return views
+
+    views = {}
+    views["cobros_view"] = transform_cobros()
+    views["creditos_view"] = transform_creditos()
+    views["estado_general_view"] = transform_estado_general(full_rebuild)
+    views["creditos_resumen_view"] = transform_creditos_resumen(views["estado_general_view"])
+    views["jugadores_view"] = transform_jugadores_dates()
+    views["categorias_view"] = transform_categorias()
+    return views
 
 
-def main():
-    transform_cobros()
-    transform_creditos()
-    transform_estado_general()
-    transform_creditos_resumen()
-    transform_jugadores_dates()
-    transform_categorias()
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Build the processed views from data/raw/.")
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="run the independent transforms in a process pool",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="worker processes with --parallel (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--full-rebuild",
+        action="store_true",
+        help="recompute estado_general for every credit, ignoring the saved state",
+    )
+    parser.add_argument(
+        "--compact-memory",
+        action="store_true",
+        help="keep tables with compact dtypes (also JOB2_COMPACT_MEMORY=1)",
+    )
+    args = parser.parse_args()
+    if args.compact_memory:
+        COMPACT_MEMORY = True
+    with run_metrics.tracked_run("job2"), profiling.profiled("job2"):
+        main(parallel=args.parallel, max_workers=args.max_workers, full_rebuild=args.full_rebuild)
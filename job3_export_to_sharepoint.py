@@ -1,6 +1,14 @@
 # redskins_dashboard/jobs/job3_export_to_sharepoint.py
 
 import os
+import json
+import hashlib
+import argparse
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
 
 from redskins_dashboard.sp_client import (
@@ -9,6 +17,8 @@ from redskins_dashboard.sp_client import (
     SP_HOST,
     SITE_PATH,
 )
+from redskins_dashboard.jobs import graph_http, profiling, run_metrics
+from redskins_dashboard.jobs.graph_http import GRAPH
 
 # Base dir = stripe_test/redskins_dashboard
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
@@ -16,9 +26,20 @@ BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 DATA_DIR      = os.path.join(BASE_DIR, "data")
 PROCESSED_DIR = os.path.join(DATA_DIR, "processed")
 RAW_DIR       = os.path.join(DATA_DIR, "raw")   # <-- separate raw dir
+STATE_DIR     = os.path.join(DATA_DIR, "state")
+
+# sha256 of every file last uploaded, by remote path
+MANIFEST_PATH = os.path.join(STATE_DIR, "job3_manifest.json")
 
-GRAPH = "https://graph.microsoft.com/v1.0"
+# How many files are uploaded at the same time
+DEFAULT_MAX_WORKERS = int(os.environ.get("JOB3_MAX_WORKERS", "4"))
 
+# Files larger than this go through a resumable upload session instead of a
+# single PUT; sessions send CHUNK_SIZE bytes per request (Graph requires a
+# multiple of 320 KiB).
+UPLOAD_SESSION_THRESHOLD = 4 * 1024 * 1024
+CHUNK_SIZE = 32 * 320 * 1024  # 10 MiB
+MAX_CHUNK_RETRIES = 5
 
 import os
 from datetime import datetime
@@ -61,10 +82,7 @@ def upload_file_to_sharepoint(
 
     # Example:
     #   /sites/{site_id}/drive/root:/Shared Documents/redskins_dashboard_processed/cobros_view.csv:/content
-    upload_url = (
-        f"{GRAPH}/sites/{site_id}/drive/root:"
-        f"{folder}/{filename}:/content"
-    )
+    item_url = f"{GRAPH}/sites/{site_id}/drive/root:{folder}/{filename}:"
 
     # Human-friendly URL
     sp_web_url = (
@@ -74,17 +92,21 @@ def upload_file_to_sharepoint(
     print(f"SharePoint URL: {sp_web_url}")
     print(f"Uploading {filename} -> {folder} ...")
 
+    if os.path.getsize(local_path) > UPLOAD_SESSION_THRESHOLD:
+        upload_url = _create_upload_session(item_url, token)
+        _upload_in_chunks(upload_url, local_path)
+        print(f"  ✔ Uploaded {filename}")
+        return
+
+    # Passing the file object streams it from disk instead of loading it whole
     with open(local_path, "rb") as f:
-        data = f.read()
-
-    resp = requests.put(
-        upload_url,
-        headers={
-            "Authorization": f"Bearer {token}",
-            "Content-Type": content_type,
-        },
-        data=data,
-    )
+        resp = graph_http.request(
+            "PUT",
+            item_url + "/content",
+            token,
+            headers={"Content-Type": content_type},
+            data=f,
+        )
 
     if resp.status_code >= 400:
         raise RuntimeError(
@@ -94,44 +116,267 @@ def upload_file_to_sharepoint(
     print(f"  ✔ Uploaded {filename}")
 
 
-def main():
-    token = get_app_token()
-    site_id = get_site_id(SP_HOST, SITE_PATH, token)
+# ----------------------------------------------------
+# Upload sessions (large files)
+# ----------------------------------------------------
+
+def _create_upload_session(item_url: str, token: str) -> str:
+    """Start a resumable upload session that replaces the file; returns its uploadUrl."""
+    resp = graph_http.request(
+        "POST",
+        item_url + "/createUploadSession",
+        token,
+        json={"item": {"@microsoft.graph.conflictBehavior": "replace"}},
+    )
+    if resp.status_code >= 400:
+        raise RuntimeError(
+            f"createUploadSession failed: {resp.status_code} {resp.reason}\n{resp.text}"
+        )
+    return resp.json()["uploadUrl"]
 
-    FILES_TO_UPLOAD = [
-        # processed
-        ("cobros_view.csv",           "/Shared Documents/redskins_dashboard_processed"),
-        ("creditos_view.csv",         "/Shared Documents/redskins_dashboard_processed"),
-        ("estado_general_view.csv",   "/Shared Documents/redskins_dashboard_processed"),
-        ("creditos_resumen_view.csv", "/Shared Documents/redskins_dashboard_processed"),
-        ("jugadores_view.csv",        "/Shared Documents/redskins_dashboard_processed"),
-        ("categorias_view.csv",       "/Shared Documents/redskins_dashboard_processed"),
-
-        # raw
-        ("jugadores_raw.csv",  "/Shared Documents/redskins_dashboard_raw"),
-        ("categorias_raw.csv", "/Shared Documents/redskins_dashboard_raw"),
-    ]
-
-    uploaded_files = []
-    
-    try:
-        for filename, remote_folder in FILES_TO_UPLOAD:
-            # If it's a “view” file, look in processed; otherwise in raw
-            base_dir = PROCESSED_DIR if "view" in filename else RAW_DIR
-            local_path = os.path.join(base_dir, filename)
 
-            upload_file_to_sharepoint(site_id, token, local_path, remote_folder)
-            uploaded_files.append(filename)
+def _next_expected_offset(upload_url: str) -> int:
+    """Ask the session where to continue (start of its first missing range)."""
+    resp = graph_http.get(upload_url)
+    if resp.status_code >= 400:
+        raise RuntimeError(
+            f"Upload session lost: {resp.status_code} {resp.reason}\n{resp.text}"
+        )
+    return int(resp.json()["nextExpectedRanges"][0].split("-")[0])
 
-        # Log success after ALL files were uploaded
-        write_execution_log(f"SUCCESS — uploaded {len(uploaded_files)} files: {uploaded_files}")
 
+def _upload_in_chunks(upload_url: str, local_path: str) -> None:
+    """
+    Sends a file to an upload session CHUNK_SIZE bytes at a time, reading
+    one chunk from disk per request.
+
+    A failed chunk is not fatal: the session is asked for the next expected
+    byte and the upload continues from there, up to MAX_CHUNK_RETRIES
+    consecutive failures. A 202 that does not move the next expected byte
+    past the chunk's start counts as a failure too. The uploadUrl is
+    pre-authenticated, so no Authorization header is sent.
+    """
+    total = os.path.getsize(local_path)
+    offset = 0
+    failures = 0
+
+    with open(local_path, "rb") as f:
+        while offset < total:
+            f.seek(offset)
+            chunk = f.read(CHUNK_SIZE)
+            end = offset + len(chunk) - 1
+            try:
+                resp = graph_http.request(
+                    "PUT",
+                    upload_url,
+                    headers={
+                        "Content-Length": str(len(chunk)),
+                        "Content-Range": f"bytes {offset}-{end}/{total}",
+                    },
+                    data=chunk,
+                )
+                if resp.status_code in (200, 201):
+                    return
+                if resp.status_code == 202:
+                    ranges = resp.json().get("nextExpectedRanges") or [f"{end + 1}-"]
+                    next_offset = int(ranges[0].split("-")[0])
+                    if next_offset > offset:
+                        offset = next_offset
+                        failures = 0
+                        continue
+                    # accepted but not moved past offset: retried as a failure
+                    # (otherwise the same chunk would be resent forever)
+                    error = f"202 without progress (next expected byte {next_offset})"
+                elif resp.status_code in (404, 410):
+                    raise RuntimeError(
+                        f"Upload session expired: {resp.status_code} {resp.reason}\n{resp.text}"
+                    )
+                else:
+                    error = f"{resp.status_code} {resp.reason}"
+            except requests.RequestException as e:
+                error = str(e)
+
+            failures += 1
+            if failures > MAX_CHUNK_RETRIES:
+                raise RuntimeError(
+                    f"Chunk upload failed at byte {offset} of {total}: {error}"
+                )
+            print(f"  ! chunk at byte {offset} failed ({error}), resuming")
+            time.sleep(min(2 ** failures, 30))
+            offset = _next_expected_offset(upload_url)
+
+    raise RuntimeError(f"Upload session did not complete after {total} bytes")
+
+
+FILES_TO_UPLOAD = [
+    # processed
+    ("cobros_view.csv",           "/Shared Documents/redskins_dashboard_processed"),
+    ("creditos_view.csv",         "/Shared Documents/redskins_dashboard_processed"),
+    ("estado_general_view.csv",   "/Shared Documents/redskins_dashboard_processed"),
+    ("creditos_resumen_view.csv", "/Shared Documents/redskins_dashboard_processed"),
+    ("jugadores_view.csv",        "/Shared Documents/redskins_dashboard_processed"),
+    ("categorias_view.csv",       "/Shared Documents/redskins_dashboard_processed"),
+    ("cobros_cubo_view.csv",      "/Shared Documents/redskins_dashboard_processed"),
+
+    # raw
+    ("jugadores_raw.csv",  "/Shared Documents/redskins_dashboard_raw"),
+    ("categorias_raw.csv", "/Shared Documents/redskins_dashboard_raw"),
+]
+
+
+def local_path_for(filename: str) -> str:
+    # If it's a “view” file, look in processed; otherwise in raw
+    base_dir = PROCESSED_DIR if "view" in filename else RAW_DIR
+    return os.path.join(base_dir, filename)
+
+
+# ----------------------------------------------------
+# Upload manifest (skip unchanged files)
+# ----------------------------------------------------
+
+_manifest_lock = threading.Lock()
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_manifest() -> dict:
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest: dict) -> None:
+    os.makedirs(STATE_DIR, exist_ok=True)
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def _remote_key(site_id: str, remote_folder: str, filename: str) -> str:
+    return f"{site_id}:{remote_folder.rstrip('/')}/{filename}"
+
+
+def sync_file(site_id: str, token: str, filename: str, remote_folder: str,
+              manifest: dict, force: bool = False) -> bool:
+    """
+    Uploads a file unless the manifest shows the same content was already
+    uploaded to that remote path. The manifest is updated (and saved) right
+    after each successful upload, so a rerun resumes with the files that
+    did not make it.
+
+    Returns True if the file was uploaded, False if it was skipped.
+    """
+    local_path = local_path_for(filename)
+    if not os.path.exists(local_path):
+        raise FileNotFoundError(local_path)
+
+    key = _remote_key(site_id, remote_folder, filename)
+    digest = file_sha256(local_path)
+    run_metrics.add(bytes_read=run_metrics.file_size(local_path))
+    if not force and manifest.get(key, {}).get("sha256") == digest:
+        print(f"  = {filename} unchanged, skipped")
+        return False
+
+    upload_file_to_sharepoint(site_id, token, local_path, remote_folder)
+
+    with _manifest_lock:
+        manifest[key] = {
+            "sha256": digest,
+            "size": os.path.getsize(local_path),
+            "uploaded": datetime.now().isoformat(timespec="seconds"),
+        }
+        _save_manifest(manifest)
+    return True
+
+
+def upload_files(site_id: str, token: str, files=FILES_TO_UPLOAD,
+                 max_workers: int = DEFAULT_MAX_WORKERS, force: bool = False):
+    """
+    Uploads every new or changed (filename, remote folder) pair concurrently,
+    at most max_workers at a time, over the shared HTTP session. With force,
+    unchanged files are uploaded too.
+
+    Every file is attempted. Returns (uploaded filenames, skipped filenames,
+    {filename: error} for the ones that failed), in FILES_TO_UPLOAD order.
+    """
+    manifest = load_manifest()
+    errors = {}
+    uploaded = set()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        # uploads run in a copy of this context (run metrics of the calling stage)
+        futures = {
+            pool.submit(
+                contextvars.copy_context().run,
+                sync_file, site_id, token, filename, remote_folder, manifest, force,
+            ): filename
+            for filename, remote_folder in files
+        }
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                if future.result():
+                    uploaded.add(filename)
+            except Exception as e:
+                print(f"  ✖ {filename}: {e}")
+                errors[filename] = e
+
+    uploaded_files = [f for f, _ in files if f in uploaded]
+    skipped_files = [f for f, _ in files if f not in uploaded and f not in errors]
+    return uploaded_files, skipped_files, errors
+
+
+def main(max_workers: int = DEFAULT_MAX_WORKERS, force: bool = False):
+    token = get_app_token()
+    site_id = get_site_id(SP_HOST, SITE_PATH, token)
+
+    try:
+        uploaded_files, skipped_files, errors = upload_files(
+            site_id, token, FILES_TO_UPLOAD, max_workers, force
+        )
     except Exception as e:
         # Log the failure with the error message
         write_execution_log(f"ERROR — {str(e)}")
         raise
 
+    if errors:
+        failed = "; ".join(f"{name}: {err}" for name, err in errors.items())
+        write_execution_log(
+            f"ERROR — {len(errors)} of {len(FILES_TO_UPLOAD)} files failed ({failed}); "
+            f"uploaded {len(uploaded_files)} files: {uploaded_files}; "
+            f"skipped {len(skipped_files)} unchanged"
+        )
+        raise RuntimeError(f"Job3 failed for files: {sorted(errors)}")
+
+    # Log success after ALL files were uploaded
+    http = graph_http.stats()
+    write_execution_log(
+        f"SUCCESS — uploaded {len(uploaded_files)} files: {uploaded_files}; "
+        f"skipped {len(skipped_files)} unchanged: {skipped_files}; "
+        f"graph: {http['requests']} requests, {http['retries']} retries"
+    )
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Upload processed and raw CSVs to SharePoint.")
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help="number of files uploaded concurrently (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="upload every file, even if unchanged since the last upload",
+    )
+    args = parser.parse_args()
+    with run_metrics.tracked_run("job3"), profiling.profiled("job3"):
+        main(max_workers=args.max_workers, force=args.force)
@@ -1,105 +1,149 @@
+# redskins_dashboard/jobs/job4_resumen_cobros.py
+#
+# Cobros summaries for the dashboard, built on job2's enriched cobros
+# (cobros_view, categoria already joined) and the estado of every credit
+# (estado_general_view):
+#
+#   cobros_cubo_view.csv               num_cobros / total_cobrado by period
+#                                      (granularidad dia, semana or mes) x
+#                                      categoria x administrador x estado
+#   cobros_resumen_mes_categoria.csv   num_cobros / total_cobrado by month
+#                                      and categoria
+#
+# The cobros are grouped once, by day and the three dimensions; every other
+# rollup regroups that daily cube, which is orders of magnitude smaller than
+# the cobros. The month x categoria summary is grouped from the cobros
+# themselves, so its totals keep their exact values. Cobros without
+# fechaCobro are left out.
+
 import pandas as pd
 from pathlib import Path
 import os
 
+from redskins_dashboard.jobs import profiling, run_metrics
+from redskins_dashboard.jobs.compact_dtypes import expand_categories
+from redskins_dashboard.jobs.raw_tables import read_snapshot
+
 # === 1) Config ===
 BASE_DIR = Path(os.path.dirname(os.path.dirname(__file__)))
 
 DATA_DIR = BASE_DIR / "data"
-RAW_DIR = DATA_DIR / "raw"
 PROCESSED_DIR = DATA_DIR / "processed"
 
-cobros_path    = RAW_DIR / "cobros_raw.csv"
-creditos_path  = RAW_DIR / "creditos_raw.csv"
-jugadores_path = RAW_DIR / "jugadores_raw.csv"
 out_path       = PROCESSED_DIR / "cobros_resumen_mes_categoria.csv"
+cubo_path      = PROCESSED_DIR / "cobros_cubo_view.csv"
+
+# cube dimension -> cobros_view column (estado is joined by idCredito)
+DIMENSIONES = {
+    "categoria": "Jugadores.categoria",
+    "administrador": "emailAdministrador",
+    "estado": None,
+}
+
+# granularidad -> period label of a day (weeks start on Monday)
+GRANULARIDADES = {
+    "dia": lambda dias: dias.dt.strftime("%Y-%m-%d"),
+    "semana": lambda dias: (dias - pd.to_timedelta(dias.dt.weekday, unit="D")).dt.strftime("%Y-%m-%d"),
+    "mes": lambda dias: dias.dt.strftime("%Y-%m"),
+}
+
+
+def _load_cobros(cobros: pd.DataFrame = None, estado: pd.DataFrame = None) -> pd.DataFrame:
+    """Day, dimensions and montoCobrado of every dated cobro."""
+    columns = ["idCredito", "fechaCobro", "montoCobrado"] + [c for c in DIMENSIONES.values() if c]
+    if cobros is None:
+        cobros = read_snapshot(str(PROCESSED_DIR / "cobros_view"), columns=columns)
+    if estado is None:
+        estado = read_snapshot(str(PROCESSED_DIR / "estado_general_view"), columns=["ID", "estadoGeneral"])
+    # views kept with compact dtypes are categorical; a dimension column the
+    # view lacks (e.g. no emailAdministrador) is kept, empty
+    cobros = expand_categories(cobros.reindex(columns=columns))
+    estado = expand_categories(estado[["ID", "estadoGeneral"]])
+
+    df = pd.DataFrame({
+        # fechaCobro is a date (or a 'YYYY-MM-DD' string when read from the CSV)
+        "fecha": pd.to_datetime(cobros["fechaCobro"], errors="coerce"),
+        **{
+            dim: cobros[col] if col else cobros["idCredito"].map(estado.set_index("ID")["estadoGeneral"])
+            for dim, col in DIMENSIONES.items()
+        },
+        "montoCobrado": cobros["montoCobrado"].fillna(0),
+    })
+    return df.dropna(subset=["fecha"])
+
+
+def build_cubo(df: pd.DataFrame) -> tuple:
+    """(daily cube, cube with every granularidad) of the cobros from _load_cobros."""
+    dims = list(DIMENSIONES)
+    cubo_dia = (
+        df.groupby(["fecha", *dims], dropna=False)
+          .agg(
+              num_cobros=("montoCobrado", "size"),      # how many cobros
+              total_cobrado=("montoCobrado", "sum"),    # total amount
+          )
+          .reset_index()
+    )
 
-
-def normalize_id(series: pd.Series) -> pd.Series:
-    """Convert IDs like 123.0 -> '123' and strip spaces."""
-    return (
-        series.astype(str)
-        .str.replace(".0", "", regex=False)
-        .str.strip()
+    rollups = []
+    for granularidad, periodo in GRANULARIDADES.items():
+        rollup = (
+            cubo_dia.groupby([periodo(cubo_dia["fecha"]).rename("periodo"), *dims], dropna=False)
+                    [["num_cobros", "total_cobrado"]]
+                    .sum()
+                    .reset_index()
+        )
+        rollup.insert(0, "granularidad", granularidad)
+        rollups.append(rollup)
+    return cubo_dia, pd.concat(rollups, ignore_index=True)
+
+
+def main(cobros: pd.DataFrame = None, estado: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Build cobros_cubo_view.csv and cobros_resumen_mes_categoria.csv; returns
+    the month x categoria summary.
+
+    cobros / estado are job2's cobros_view and estado_general_view when it
+    ran in the same process; otherwise their snapshots are read.
+    """
+
+    # === 2) Load the enriched cobros ===
+    df = _load_cobros(cobros, estado)
+
+    # === 3) Group once by day + dimensions, then roll up ===
+    cubo_dia, cubo = build_cubo(df)
+
+    # === 4) Month x categoria summary ===
+    # grouped from the cobros, not the cube, so its totals are summed in the
+    # same order as always
+    resumen = (
+        df.groupby(
+            [df["fecha"].dt.year.rename("anio"), df["fecha"].dt.month.rename("mes"), "categoria"],
+            dropna=False,
+        )
+          .agg(
+              num_cobros=("montoCobrado", "size"),
+              total_cobrado=("montoCobrado", "sum"),
+          )
+          .reset_index()
+    )
+    # Pretty YYYY-MM monthly label, e.g. 2025-11
+    resumen["mes"] = resumen["anio"].astype(str) + "-" + resumen["mes"].astype(str).str.zfill(2)
+    resumen = resumen.rename(columns={"mes": "mes_label"})
+
+    # === 5) Save to CSV ===
+    cubo.to_csv(cubo_path, index=False)
+    resumen.to_csv(out_path, index=False, encoding="utf-8-sig")
+    run_metrics.add(
+        rows_out=len(cubo) + len(resumen),
+        bytes_written=run_metrics.file_size(cubo_path) + run_metrics.file_size(out_path),
     )
 
+    print(f"✅ Cubo escrito en: {cubo_path} (rows={len(cubo)}, from {len(df)} cobros)")
+    print(f"✅ Resumen escrito en: {out_path}")
+    print(resumen.head())
+    return resumen
+
 
-# === 2) Load data ===
-df_cobros    = pd.read_csv(cobros_path)
-df_creditos  = pd.read_csv(creditos_path)
-df_jugadores = pd.read_csv(jugadores_path)
-
-# --- 2.1 Normalize IDs for joins ---
-# cobros: idCredito (to join with creditos)
-df_cobros["idCredito_norm"] = normalize_id(df_cobros["idCredito"])
-
-# creditos: 'id' is the SharePoint item id for the crédito
-df_creditos["ID_norm"] = normalize_id(df_creditos["id"])
-
-# jugadores: 'id' is the player id
-df_jugadores["idJugador_norm"] = normalize_id(df_jugadores["id"])
-
-# === 3) Join cobros -> creditos -> jugadores to get categoria ===
-
-# 3.1 cobros + creditos
-df = df_cobros.merge(
-    df_creditos[["id", "ID_norm", "idJugador"]],
-    left_on="idCredito_norm",
-    right_on="ID_norm",
-    how="left",
-    suffixes=("", "_cred")
-)
-
-# 3.2 join jugadores by idJugador
-df["idJugador_norm"] = normalize_id(df["idJugador"])
-df = df.merge(
-    df_jugadores[["id", "idJugador_norm", "categoria"]],
-    on="idJugador_norm",
-    how="left",
-    suffixes=("", "_jug")
-)
-
-# === 4) Clean dates & amounts ===
-
-# fechaCobro -> datetime
-df["fechaCobro"] = pd.to_datetime(df["fechaCobro"], errors="coerce")
-df = df.dropna(subset=["fechaCobro"])  # keep only rows with valid date
-
-# montoCobrado -> numeric
-df["montoCobrado"] = pd.to_numeric(df["montoCobrado"], errors="coerce").fillna(0)
-
-# year / month
-df["anio"] = df["fechaCobro"].dt.year
-df["mes"]  = df["fechaCobro"].dt.month
-
-# Optional pretty month label, e.g. 2025-11
-# year / month
-df["anio"] = df["fechaCobro"].dt.year
-df["mes"]  = df["fechaCobro"].dt.month
-
-# Pretty YYYY-MM monthly label
-df["mes_label"] = pd.to_datetime(
-    df.rename(columns={"anio": "year", "mes": "month"})[["year", "month"]]
-      .assign(day=1),
-    errors="coerce"
-).dt.strftime("%Y-%m")
-
-
-# === 5) Group by month + categoria ===
-resumen = (
-    df.groupby(["anio", "mes_label", "categoria"], dropna=False)
-      .agg(
-          num_cobros=("id", "count"),          # how many cobros
-          total_cobrado=("montoCobrado", "sum")  # total amount
-      )
-      .reset_index()
-)
-
-# Order columns nicely
-resumen = resumen[["anio", "mes_label", "categoria", "num_cobros", "total_cobrado"]]
-
-# === 6) Save to CSV ===
-resumen.to_csv(out_path, index=False, encoding="utf-8-sig")
-
-print(f"✅ Resumen escrito en: {out_path}")
-print(resumen.head())
+if __name__ == "__main__":
+    with run_metrics.tracked_run("job4"), profiling.profiled("job4"):
+        main()
@@ -0,0 +1,250 @@
+# redskins_dashboard/jobs/pipeline.py
+#
+# Runs the whole refresh in one process, as a dependency graph:
+#
+#   job1 (ingest) -> job2 (transform) -> job4 (cobros cube) -> job3 (upload)
+#
+# A stage starts as soon as the stages it depends on have finished. Data is
+# handed over in memory: job1 registers the lists it downloaded with the raw
+# table registry (job2 never reads the raw snapshots back), job2 passes
+# estado_general to creditos_resumen and its cobros / estado views to job4
+# directly.
+#
+# Files still written: the raw snapshots (delta-sync state, and job3 uploads
+# two of them), the view CSVs and job4's cube that job3 uploads, and job4's
+# monthly summary. The Parquet snapshots of the views are only written with
+# --checkpoint.
+#
+# Every run appends its per-stage metrics to data/metrics/runs.jsonl
+# (see run_metrics.py), and optionally to a Prometheus textfile. With
+# --profile every stage also writes a profile (see profiling.py).
+#
+#   python -m redskins_dashboard.jobs.pipeline [--full-refresh] [--checkpoint]
+#       [--skip job1 ...] [--low-memory] [--parallel-transforms]
+#       [--max-workers N] [--force-upload] [--compact-memory]
+#       [--metrics-file PATH] [--prometheus-textfile PATH] [--profile]
+
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from redskins_dashboard.jobs import job1_ingest_from_sharepoint as job1
+from redskins_dashboard.jobs import job2_transform_local as job2
+from redskins_dashboard.jobs import job3_export_to_sharepoint as job3
+from redskins_dashboard.jobs import job4_resumen_cobros as job4
+from redskins_dashboard.jobs import profiling, run_metrics
+from redskins_dashboard.jobs.raw_tables import clear_raw_cache, register_raw
+
+
+def _run_job1(ctx: dict):
+    # keep=False streams full refreshes to disk; job2/job4 then load the snapshots
+    frames = job1.main(
+        full_refresh=ctx["full_refresh"],
+        max_workers=ctx["max_workers"],
+        keep=not ctx["low_memory"],
+    )
+    for name, df in frames.items():
+        register_raw(name, df)
+
+
+def _run_job2(ctx: dict):
+    job2.SAVE_VIEW_SNAPSHOTS = ctx["checkpoint"]
+    job2.COMPACT_MEMORY = job2.COMPACT_MEMORY or ctx["compact_memory"]
+    ctx["views"] = job2.main(parallel=ctx["parallel_transforms"])
+
+
+def _run_job3(ctx: dict):
+    job3.main(max_workers=ctx["max_workers"], force=ctx["force_upload"])
+
+
+def _run_job4(ctx: dict):
+    # views are not in ctx when job2 was skipped: job4 reads their snapshots
+    views = ctx.get("views", {})
+    ctx["resumen"] = job4.main(views.get("cobros_view"), views.get("estado_general_view"))
+
+
+# stage -> (stages it depends on, runner)
+STAGES = {
+    "job1": ((),        _run_job1),
+    "job2": (("job1",), _run_job2),
+    "job3": (("job2", "job4"), _run_job3),
+    "job4": (("job2",), _run_job4),
+}
+
+
+def _timed(name: str, ctx: dict) -> float:
+    print(f"=== {name} started ===")
+    start = time.perf_counter()
+    with ctx["metrics"].stage(name), profiling.profiled(name):
+        STAGES[name][1](ctx)
+    elapsed = time.perf_counter() - start
+    print(f"=== {name} finished in {elapsed:.2f}s ===")
+    return elapsed
+
+
+def run_pipeline(skip=(), full_refresh: bool = False, checkpoint: bool = False,
+                 low_memory: bool = False, max_workers: int = job1.DEFAULT_MAX_WORKERS,
+                 force_upload: bool = False, parallel_transforms: bool = False,
+                 compact_memory: bool = False, profile: bool = False,
+                 metrics_path: str = run_metrics.METRICS_PATH,
+                 prometheus_path: str = run_metrics.PROMETHEUS_TEXTFILE) -> dict:
+    """
+    Runs every stage not in `skip`, each once its dependencies are done.
+    Skipped stages count as done (their files on disk are used instead).
+
+    If a stage fails, the stages depending on it are not run, the others
+    still are, and a RuntimeError is raised at the end.
+
+    With profile, every stage (and job2 worker) writes a profile to
+    data/profiles/ (see profiling.py).
+
+    The run's metrics are appended to metrics_path (and written to
+    prometheus_path when given), whether it failed or not.
+
+    The job2 / profiling switches set for the run are restored afterwards,
+    so a later run in the same process starts from the defaults again.
+
+    Returns {stage: elapsed seconds} of the stages that ran.
+    """
+    ctx = {
+        "full_refresh": full_refresh,
+        "checkpoint": checkpoint,
+        "low_memory": low_memory,
+        "max_workers": max_workers,
+        "force_upload": force_upload,
+        "parallel_transforms": parallel_transforms,
+        "compact_memory": compact_memory,
+        "metrics": run_metrics.Run(),
+    }
+    saved = (job2.SAVE_VIEW_SNAPSHOTS, job2.COMPACT_MEMORY, profiling.ENABLED)
+    profiling.ENABLED = profiling.ENABLED or profile
+    try:
+        return _run_stages(ctx, skip, metrics_path, prometheus_path)
+    finally:
+        job2.SAVE_VIEW_SNAPSHOTS, job2.COMPACT_MEMORY, profiling.ENABLED = saved
+
+
+def _run_stages(ctx: dict, skip, metrics_path: str, prometheus_path: str) -> dict:
+    clear_raw_cache()
+
+    pending = [name for name in STAGES if name not in skip]
+    done = set(skip)
+    failed = {}
+    timings = {}
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=len(STAGES)) as pool:
+        running = {}
+        while pending or running:
+            for name in list(pending):
+                deps = STAGES[name][0]
+                if any(dep in failed for dep in deps):
+                    pending.remove(name)
+                    failed[name] = "not run, a dependency failed"
+                    print(f"  ✖ {name}: {failed[name]}")
+                elif all(dep in done for dep in deps):
+                    pending.remove(name)
+                    running[pool.submit(_timed, name, ctx)] = name
+
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    timings[name] = future.result()
+                    done.add(name)
+                except Exception as e:
+                    print(f"  ✖ {name}: {e}")
+                    failed[name] = e
+
+    print("Stage timings:")
+    for name in STAGES:
+        if name in timings:
+            print(f"  {name:<6} {timings[name]:8.2f}s")
+        elif name in failed:
+            print(f"  {name:<6}   failed")
+    print(f"  {'total':<6} {time.perf_counter() - start:8.2f}s")
+
+    record = ctx["metrics"].write(metrics_path, prometheus_path)
+    print(f"Run metrics ({record['run_id']}) appended to {metrics_path}")
+
+    if failed:
+        raise RuntimeError(f"Pipeline failed for stages: {sorted(failed)}")
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run job1 -> job2 -> job3 / job4 in one process.")
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="re-read every SharePoint list in full instead of applying delta changes",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="also write the Parquet snapshots of the processed views",
+    )
+    parser.add_argument(
+        "--skip",
+        nargs="+",
+        choices=list(STAGES),
+        default=[],
+        help="stages not to run; their outputs on disk are used instead",
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="stream full list downloads to disk instead of keeping them in memory",
+    )
+    parser.add_argument(
+        "--parallel-transforms",
+        action="store_true",
+        help="run the independent job2 transforms in a process pool",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=job1.DEFAULT_MAX_WORKERS,
+        help="concurrent list downloads / file uploads (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--force-upload",
+        action="store_true",
+        help="upload every file, even if unchanged since the last upload",
+    )
+    parser.add_argument(
+        "--compact-memory",
+        action="store_true",
+        help="keep the job2 tables with compact dtypes (categoricals, 32-bit ints)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=run_metrics.METRICS_PATH,
+        help="JSON-lines file the run metrics are appended to (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--prometheus-textfile",
+        default=run_metrics.PROMETHEUS_TEXTFILE,
+        help="also write the run metrics to this Prometheus textfile",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="write a cProfile / sampled-stack profile of every stage (also JOBS_PROFILE=1)",
+    )
+    args = parser.parse_args()
+    run_pipeline(
+        skip=args.skip,
+        full_refresh=args.full_refresh,
+        checkpoint=args.checkpoint,
+        low_memory=args.low_memory,
+        max_workers=args.max_workers,
+        force_upload=args.force_upload,
+        parallel_transforms=args.parallel_transforms,
+        compact_memory=args.compact_memory,
+        profile=args.profile,
+        metrics_path=args.metrics_file,
+        prometheus_path=args.prometheus_textfile,
+    )
@@ -0,0 +1,159 @@
+# redskins_dashboard/jobs/profiling.py
+#
+# On-demand profiling of the jobs. When enabled, every profiled block (a
+# pipeline stage, a job run on its own, a job2 transform in a worker process)
+# writes two files to data/profiles/:
+#
+#   <time>_<name>.pstats     cProfile statistics (python -m pstats, snakeviz)
+#   <time>_<name>.collapsed  sampled stacks, one "a;b;c count" line per stack,
+#                            the input of flamegraph.pl / speedscope
+#
+# cProfile sees every call but inflates the cost of many small Python calls;
+# the sampler (a thread reading the profiled thread's stack every few ms)
+# does not, and shows where the wall time went, waits included.
+#
+# Disabled by default: a disabled block costs one flag check. Enable it with
+# JOBS_PROFILE=1 (any job or the pipeline), pipeline --profile, or run a job
+# or a single job2 transform under this module:
+#
+#   python -m redskins_dashboard.jobs.profiling job2.transform_creditos_resumen
+#       [--out DIR] [--interval SECONDS] [--top N]
+#
+# Both profilers follow one thread: work a stage hands to its own thread
+# pool (job1 downloads, job3 uploads) shows as waiting. job2's worker
+# processes write their own profiles.
+
+import os
+import sys
+import time
+import pstats
+import cProfile
+import argparse
+import importlib
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+ENABLED = os.environ.get("JOBS_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.environ.get("JOBS_PROFILE_DIR", os.path.join(DATA_DIR, "profiles"))
+# seconds between two stack samples
+SAMPLE_INTERVAL = float(os.environ.get("JOBS_PROFILE_INTERVAL", "0.005"))
+
+# target name -> (module, entry point) for the command line
+ENTRY_POINTS = {
+    "job1": ("redskins_dashboard.jobs.job1_ingest_from_sharepoint", "main"),
+    "job2": ("redskins_dashboard.jobs.job2_transform_local", "main"),
+    "job3": ("redskins_dashboard.jobs.job3_export_to_sharepoint", "main"),
+    "job4": ("redskins_dashboard.jobs.job4_resumen_cobros", "main"),
+}
+
+
+def _frame_label(code) -> str:
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class _StackSampler(threading.Thread):
+    """Counts the stacks of one thread, sampled every `interval` seconds."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+
+def write_collapsed(stacks: Counter, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in sorted(stacks.items()):
+            f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profiled(name: str, enabled: bool = None, out_dir: str = None,
+             interval: float = None):
+    """
+    Profile the block when enabled (default: ENABLED). Yields the path prefix
+    of the profile files, or None when disabled.
+    """
+    if not (ENABLED if enabled is None else enabled):
+        yield None
+        return
+
+    out_dir = out_dir or PROFILE_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    prefix = os.path.join(out_dir, f"{time.strftime('%Y%m%d-%H%M%S')}_{name}")
+
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Python 3.12+ allows one cProfile at a time (stages running side by side)
+        print(f"  ! {name}: another profiler is active, only sampling stacks")
+        profile = None
+    sampler = _StackSampler(threading.get_ident(), interval or SAMPLE_INTERVAL)
+    sampler.start()
+    try:
+        yield prefix
+    finally:
+        stacks = sampler.stop()
+        if profile is not None:
+            profile.disable()
+            profile.dump_stats(prefix + ".pstats")
+        write_collapsed(stacks, prefix + ".collapsed")
+        print(f"✔ {name} profile written to {prefix}.*")
+
+
+def _resolve(target: str):
+    """'job2' -> job2.main, 'job2.transform_cobros' -> that transform."""
+    job, _, attr = target.partition(".")
+    if job not in ENTRY_POINTS:
+        raise ValueError(f"Unknown target {target!r}: expected one of {', '.join(ENTRY_POINTS)}, optionally .<function>")
+    module_name, entry_point = ENTRY_POINTS[job]
+    module = importlib.import_module(module_name)
+    func = getattr(module, attr or entry_point, None)
+    if not callable(func):
+        raise ValueError(f"{module_name} has no function {attr!r}")
+    return func
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile a job or a single job2 transform.")
+    parser.add_argument(
+        "target",
+        help="job1 ... job4, or job.function (e.g. job2.transform_estado_general)",
+    )
+    parser.add_argument("--out", default=PROFILE_DIR, help="profiles directory (default: %(default)s)")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=SAMPLE_INTERVAL,
+        help="seconds between stack samples (default: %(default)s)",
+    )
+    parser.add_argument("--top", type=int, default=20, help="functions to print, by cumulative time (default: %(default)s)")
+    args = parser.parse_args()
+
+    func = _resolve(args.target)
+    with profiled(args.target, enabled=True, out_dir=args.out, interval=args.interval) as prefix:
+        func()
+    if args.top and os.path.exists(prefix + ".pstats"):
+        pstats.Stats(prefix + ".pstats").sort_stats("cumulative").print_stats(args.top)
@@ -0,0 +1,282 @@
+# redskins_dashboard/jobs/query_service.py
+#
+# Local read-only HTTP/JSON service over the processed views, for looking up
+# one player or credit without downloading whole CSVs:
+#
+#   GET /health                  snapshot load time, source files, row counts
+#   GET /jugadores/<id>          the player's creditos_resumen_view rows (one
+#                                per credit, or the SIN CREDITO row) and the
+#                                cobros of those credits
+#   GET /creditos/<id>           the credit's creditos_resumen_view row and
+#                                its cobros
+#   GET /creditos?categoria=Sub-10&estado=MOROSO[&limit=100][&offset=0]
+#                                creditos_resumen_view rows by categoria and /
+#                                or estado (estaFinalGeneral)
+#
+# The views are loaded once into a Snapshot: the frames plus dict indexes
+# (value -> row positions) by player ID, credit ID, categoria and estado, so
+# a query is a dict lookup and the JSON of a few rows.
+#
+# Hot reload: a thread polls the mtime and size of the view files. Once they
+# changed and then stayed the same for one poll (job2 has finished writing
+# them), a new Snapshot is loaded and swapped in with one assignment; requests
+# in flight keep the snapshot they started with, and if loading fails the
+# previous snapshot keeps being served.
+#
+#   python -m redskins_dashboard.jobs.query_service [--host H] [--port P] [--poll SECONDS]
+
+import os
+import json
+import argparse
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from redskins_dashboard.jobs.raw_tables import read_snapshot
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
+
+DEFAULT_HOST = os.environ.get("QUERY_SERVICE_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.environ.get("QUERY_SERVICE_PORT", "8765"))
+# seconds between two checks of the view files
+POLL_INTERVAL = float(os.environ.get("QUERY_SERVICE_POLL", "5"))
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+VIEWS = ["creditos_resumen_view", "cobros_view"]
+
+
+class BadRequest(Exception):
+    """The request's ID or limit / offset cannot be parsed (HTTP 400)."""
+
+
+def source_signature(processed_dir: str) -> tuple:
+    """(path, mtime, size) of every snapshot file of VIEWS that exists."""
+    signature = []
+    for view in VIEWS:
+        for ext in (".parquet", ".csv"):
+            path = os.path.join(processed_dir, view + ext)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            signature.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+def _index(values: pd.Series, ids: bool = False) -> dict:
+    """value -> ascending positions of the rows holding it (missing values left out)."""
+    if ids:
+        values = pd.to_numeric(values, errors="coerce")
+    groups = values.groupby(values.to_numpy(), sort=False).indices
+    return {(int(key) if ids else str(key)): positions for key, positions in groups.items()}
+
+
+def _records(df: pd.DataFrame, positions) -> list:
+    """Rows at positions as JSON-ready dicts (missing values -> None, dates ISO)."""
+    return json.loads(df.iloc[positions].to_json(orient="records", date_format="iso"))
+
+
+class Snapshot:
+    """The views and their indexes as loaded at one point in time (never modified)."""
+
+    def __init__(self, processed_dir: str = PROCESSED_DIR):
+        # taken before reading: a write during the load shows as a change
+        self.signature = source_signature(processed_dir)
+        self.loaded_at = datetime.now().isoformat(timespec="seconds")
+
+        self.creditos = read_snapshot(os.path.join(processed_dir, "creditos_resumen_view")).reset_index(drop=True)
+        self.cobros = read_snapshot(os.path.join(processed_dir, "cobros_view")).reset_index(drop=True)
+
+        self.by_jugador = _index(self.creditos["idJugador"], ids=True)
+        self.by_credito = _index(self.creditos["ID"], ids=True)
+        # categoria is filled for players without credit too (Categoria is not)
+        self.by_categoria = _index(self.creditos["categoria"])
+        self.by_estado = _index(self.creditos["estaFinalGeneral"])
+        self.cobros_by_credito = _index(self.cobros["idCredito"], ids=True)
+
+    def cobros_of(self, credit_ids) -> list:
+        positions = [self.cobros_by_credito[c] for c in credit_ids if c in self.cobros_by_credito]
+        if not positions:
+            return []
+        return _records(self.cobros, np.sort(np.concatenate(positions)))
+
+    def jugador(self, jugador_id: int):
+        positions = self.by_jugador.get(jugador_id)
+        if positions is None:
+            return None
+        creditos = _records(self.creditos, positions)
+        return {
+            "idJugador": jugador_id,
+            "creditos": creditos,
+            "cobros": self.cobros_of(int(c["ID"]) for c in creditos if c["ID"] is not None),
+        }
+
+    def credito(self, credito_id: int):
+        positions = self.by_credito.get(credito_id)
+        if positions is None:
+            return None
+        return {
+            "credito": _records(self.creditos, positions[:1])[0],
+            "cobros": self.cobros_of([credito_id]),
+        }
+
+    def creditos_filtered(self, categoria: str = None, estado: str = None,
+                          limit: int = DEFAULT_LIMIT, offset: int = 0) -> dict:
+        positions = np.arange(len(self.creditos))
+        for index, value in ((self.by_categoria, categoria), (self.by_estado, estado)):
+            if value is not None:
+                positions = np.intersect1d(positions, index.get(value, []), assume_unique=True)
+        return {
+            "total": int(len(positions)),
+            "offset": offset,
+            "items": _records(self.creditos, positions[offset:offset + limit]),
+        }
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "loaded_at": self.loaded_at,
+            "sources": [
+                {"path": path, "modified": datetime.fromtimestamp(mtime / 1e9).isoformat(timespec="seconds")}
+                for path, mtime, _ in self.signature
+            ],
+            "rows": {"creditos_resumen_view": len(self.creditos), "cobros_view": len(self.cobros)},
+            "jugadores": len(self.by_jugador),
+            "creditos": len(self.by_credito),
+        }
+
+
+class QueryServer(ThreadingHTTPServer):
+    """Serves the current Snapshot and reloads it when the view files change."""
+
+    daemon_threads = True
+
+    def __init__(self, address, processed_dir: str = PROCESSED_DIR,
+                 poll_interval: float = POLL_INTERVAL):
+        self.processed_dir = processed_dir
+        self.poll_interval = poll_interval
+        self.snapshot = Snapshot(processed_dir)
+        self._stop_event = threading.Event()
+        self._watcher = threading.Thread(target=self._watch, name="query-service-reload", daemon=True)
+        super().__init__(address, _Handler)
+
+    def serve_forever(self, poll_interval: float = 0.5):
+        self._watcher.start()
+        super().serve_forever(poll_interval)
+
+    def shutdown(self):
+        self._stop_event.set()
+        super().shutdown()
+
+    def _watch(self):
+        pending = None
+        while not self._stop_event.wait(self.poll_interval):
+            signature = source_signature(self.processed_dir)
+            if signature == self.snapshot.signature:
+                pending = None
+                continue
+            if signature != pending:
+                # changed since the last poll: maybe still being written
+                pending = signature
+                continue
+            try:
+                snapshot = Snapshot(self.processed_dir)
+            except Exception as e:
+                print(f"  ! reload failed, still serving the views loaded at {self.snapshot.loaded_at}: {e}")
+                continue
+            self.snapshot = snapshot
+            pending = None
+            print(
+                f"✔ views reloaded ({len(snapshot.creditos)} creditos_resumen rows, "
+                f"{len(snapshot.cobros)} cobros)"
+            )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "redskins-query/1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        # one snapshot for the whole request, even if a reload swaps it meanwhile
+        snapshot = self.server.snapshot
+
+        try:
+            if parts == ["health"]:
+                return self._send(200, snapshot.health())
+            if parts == ["creditos"]:
+                try:
+                    limit = min(int(params.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+                    offset = int(params.get("offset", 0))
+                except ValueError:
+                    raise BadRequest("limit and offset must be integers")
+                if limit < 0 or offset < 0:
+                    raise BadRequest("limit and offset must not be negative")
+                return self._send(200, snapshot.creditos_filtered(
+                    params.get("categoria"), params.get("estado"), limit, offset,
+                ))
+            if len(parts) == 2 and parts[0] in ("jugadores", "creditos"):
+                if not parts[1].isdigit():
+                    raise BadRequest(f"invalid ID {parts[1]!r}")
+                key = int(parts[1])
+                if parts[0] == "jugadores":
+                    result, label = snapshot.jugador(key), "jugador"
+                else:
+                    result, label = snapshot.credito(key), "credito"
+                if result is None:
+                    return self._send(404, {"error": f"{label} {key} not found"})
+                return self._send(200, result)
+        except BadRequest as e:
+            return self._send(400, {"error": str(e)})
+        except Exception as e:
+            # still answer: the client gets an error, not a dropped connection
+            self.log_error("%s failed: %r", self.path, e)
+            return self._send(500, {"error": f"internal error: {type(e).__name__}: {e}"})
+        self._send(404, {"error": f"unknown path {url.path}"})
+
+    def _send(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          processed_dir: str = PROCESSED_DIR, poll_interval: float = POLL_INTERVAL):
+    server = QueryServer((host, port), processed_dir, poll_interval)
+    snapshot = server.snapshot
+    print(
+        f"✔ Serving {len(snapshot.creditos)} creditos_resumen rows and {len(snapshot.cobros)} cobros "
+        f"on http://{host}:{port} (views checked every {poll_interval:g}s)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read-only JSON queries over the processed views.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to bind (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port (default: %(default)s)")
+    parser.add_argument(
+        "--poll",
+        type=float,
+        default=POLL_INTERVAL,
+        help="seconds between checks of the view files for a reload (default: %(default)s)",
+    )
+    parser.add_argument("--processed-dir", default=PROCESSED_DIR, help="views directory (default: %(default)s)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.processed_dir, args.poll)
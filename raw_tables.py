@@ -0,0 +1,336 @@
+# redskins_dashboard/jobs/raw_tables.py
+#
+# Shared loader for the raw SharePoint snapshots written by job1.
+#
+# Each list is read and typed once per process (ids parsed to nullable
+# integers, numeric columns coerced, date columns parsed to tz-naive UTC). job2 transforms and job4 then get
+# their tables from an in-process registry instead of re-reading the files.
+# When job1 runs in the same process (pipeline.py), it registers the lists
+# it just downloaded, and the snapshots are not read back at all.
+#
+# Snapshots are stored as Parquet when pyarrow is installed (typed, columnar,
+# read with column pruning) and as CSV otherwise. When both exist for the
+# same table, the most recently written one is used.
+
+import os
+import importlib.util
+import numpy as np
+import pandas as pd
+
+from redskins_dashboard.jobs import run_metrics
+from redskins_dashboard.jobs.date_utils import parse_sharepoint_datetime
+
+# Base dir = redskins_dashboard/
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+DATA_DIR = os.path.join(BASE_DIR, "data")
+RAW_DIR  = os.path.join(DATA_DIR, "raw")
+
+# Parquet snapshots need pyarrow; without it everything stays CSV.
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+# Declared schema of each raw list (SharePoint column names, before any rename).
+# Columns not listed here are kept as read from the snapshot.
+#   ids     : item ids and lookups to other lists -> nullable Int64 join keys
+#   numeric : other numbers -> float / int
+#   dates   : -> tz-naive UTC datetimes
+RAW_TABLES = {
+    "cobros": {
+        "file": "cobros_raw.csv",
+        "ids": ["id", "idCredito"],
+        "numeric": ["montoCuota", "montoCobrado", "latitud", "longitud"],
+        "dates": ["fechaCobro"],
+    },
+    "creditos": {
+        "file": "creditos_raw.csv",
+        "ids": ["id", "idJugador"],
+        "numeric": ["montoFinanciado", "cantCuotas", "montoCuota"],
+        "dates": ["fechaInicioTemp"],
+    },
+    "jugadores": {
+        "file": "jugadores_raw.csv",
+        "ids": ["id"],
+        "numeric": [],
+        "dates": [],
+    },
+    "categorias": {
+        "file": "categorias_raw.csv",
+        "ids": ["id"],
+        "numeric": [],
+        "dates": ["Created", "Modified", "_ComplianceTagWrittenTime"],
+    },
+}
+
+# name (or (name, columns)) -> typed DataFrame, filled on first use
+_REGISTRY: dict = {}
+
+# object columns whose values pyarrow can store as-is
+_ARROW_SAFE_OBJECTS = {
+    "string", "empty", "integer", "floating", "mixed-integer-float",
+    "boolean", "date", "datetime", "decimal", "bytes",
+}
+
+
+def canonical_id(series: pd.Series) -> pd.Series:
+    """
+    Parse SharePoint ids (Graph strings, ints, or floats like 12.0 from a
+    CSV with blanks) into a nullable Int64 key. Anything that is not an
+    integral number becomes <NA>.
+    """
+    values = pd.to_numeric(series, errors="coerce")
+    if pd.api.types.is_float_dtype(values):
+        values = values.where(np.floor(values) == values)
+    return values.astype("Int64")
+
+
+def apply_schema(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce the declared id / numeric / date columns of a raw table in place."""
+    spec = RAW_TABLES[name]
+
+    for col in spec["ids"]:
+        if col in df.columns:
+            df[col] = canonical_id(df[col])
+
+    for col in spec["numeric"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    for col in spec["dates"]:
+        if col in df.columns:
+            df[col] = parse_sharepoint_datetime(df[col])
+
+    return df
+
+
+# ----------------------------------------------------
+# Snapshot files (Parquet / CSV)
+# ----------------------------------------------------
+
+def _snapshot_source(base_path: str):
+    """
+    Return (path, format) of the freshest snapshot for base_path
+    (a path without extension), or (None, None) if there is none.
+    """
+    parquet_path = base_path + ".parquet"
+    csv_path     = base_path + ".csv"
+
+    candidates = []
+    if HAS_PYARROW and os.path.exists(parquet_path):
+        candidates.append((os.path.getmtime(parquet_path), 1, parquet_path, "parquet"))
+    if os.path.exists(csv_path):
+        candidates.append((os.path.getmtime(csv_path), 0, csv_path, "csv"))
+
+    if not candidates:
+        return None, None
+
+    # newest file wins; Parquet on a tie
+    _, _, path, fmt = max(candidates)
+    return path, fmt
+
+
+def read_snapshot(base_path: str, columns=None) -> pd.DataFrame:
+    """
+    Read a snapshot written by write_snapshot (or a plain CSV) given its path
+    without extension. Only `columns` are read when given; requested columns
+    that do not exist in the file are ignored.
+    """
+    path, fmt = _snapshot_source(base_path)
+    if path is None:
+        raise FileNotFoundError(base_path + ".parquet / .csv")
+    run_metrics.add(bytes_read=run_metrics.file_size(path))
+
+    if fmt == "parquet":
+        if columns is None:
+            return pd.read_parquet(path)
+        import pyarrow.parquet as pq
+        present = set(pq.read_schema(path).names)
+        return pd.read_parquet(path, columns=[c for c in columns if c in present])
+
+    if columns is None:
+        return pd.read_csv(path)
+    wanted = set(columns)
+    return pd.read_csv(path, usecols=lambda c: c in wanted)
+
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """Stringify object columns holding values Parquet cannot store (dicts, mixed types)."""
+    out = df
+    for col in df.columns:
+        s = df[col]
+        if s.dtype != object:
+            continue
+        if pd.api.types.infer_dtype(s, skipna=True) in _ARROW_SAFE_OBJECTS:
+            continue
+        if out is df:
+            out = df.copy()
+        out[col] = s.where(s.isna(), s.astype(str))
+    return out
+
+
+def write_snapshot(df: pd.DataFrame, base_path: str):
+    """
+    Write df as a Parquet snapshot at base_path + ".parquet".
+
+    Returns the written path, or None when Parquet is not available or the
+    frame could not be converted (callers then fall back to CSV).
+    """
+    if not HAS_PYARROW:
+        return None
+
+    path = base_path + ".parquet"
+    try:
+        _arrow_safe(df).to_parquet(path, index=False)
+    except Exception as e:
+        print(f"  ! Parquet snapshot skipped for {os.path.basename(path)}: {e}")
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+    run_metrics.add(bytes_written=run_metrics.file_size(path))
+    return path
+
+
+def _unified_arrow_schema(column_types: dict):
+    """
+    One Arrow schema for snapshot pages whose column types drifted:
+    the single type seen, float64 for mixed ints / floats, ns timestamps
+    for mixed timestamp units, string for anything else.
+
+    column_types maps each column to (type of the first page, types of the
+    pages where the column has values).
+    """
+    import pyarrow as pa
+
+    fields = []
+    for col, (first_type, types) in column_types.items():
+        if not types:
+            t = first_type
+        elif len(types) == 1:
+            t = next(iter(types))
+        elif all(pa.types.is_integer(x) or pa.types.is_floating(x) for x in types):
+            t = pa.float64()
+        elif all(pa.types.is_timestamp(x) and x.tz is None for x in types):
+            t = pa.timestamp("ns")
+        else:
+            t = pa.string()
+        fields.append(pa.field(col, t))
+    return pa.schema(fields)
+
+
+def write_snapshot_frames(frames, base_path: str):
+    """
+    Write a Parquet snapshot page by page, one row group per frame, so only
+    one frame is held in memory at a time.
+
+    `frames` is a callable returning an iterator over the DataFrames (it is
+    called twice: once to settle the column types, once to write). All
+    frames must have the same columns in the same order; a column whose type
+    differs between frames is written with a common type (see
+    _unified_arrow_schema).
+
+    Returns the written path, or None like write_snapshot.
+    """
+    if not HAS_PYARROW:
+        return None
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = base_path + ".parquet"
+    tmp_path = path + ".tmp"
+    try:
+        # pass 1: types actually seen per column (all-null pages don't vote)
+        column_types = None
+        for df in frames():
+            table = pa.Table.from_pandas(_arrow_safe(df), preserve_index=False)
+            if column_types is None:
+                column_types = {
+                    name: (column.type, set())
+                    for name, column in zip(table.column_names, table.columns)
+                }
+            for name, column in zip(table.column_names, table.columns):
+                if column.null_count < len(column):
+                    column_types[name][1].add(column.type)
+        if column_types is None:
+            return None
+        schema = _unified_arrow_schema(column_types)
+
+        # pass 2: one row group per frame, cast to the common schema
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for df in frames():
+                table = pa.Table.from_pandas(_arrow_safe(df), preserve_index=False)
+                writer.write_table(table.replace_schema_metadata(None).cast(schema))
+        os.replace(tmp_path, path)
+        run_metrics.add(bytes_written=run_metrics.file_size(path))
+    except Exception as e:
+        print(f"  ! Parquet snapshot skipped for {os.path.basename(path)}: {e}")
+        for p in (tmp_path, path):
+            if os.path.exists(p):
+                os.remove(p)
+        return None
+    return path
+
+
+def raw_base_path(name: str) -> str:
+    """Path (without extension) of the raw snapshot of a list."""
+    return os.path.join(RAW_DIR, os.path.splitext(RAW_TABLES[name]["file"])[0])
+
+
+# ----------------------------------------------------
+# Registry
+# ----------------------------------------------------
+
+def load_raw(name: str, columns=None) -> pd.DataFrame:
+    """
+    Return the typed raw table for a SharePoint list
+    ("cobros", "creditos", "jugadores" or "categorias").
+
+    `columns` limits the table to those columns (missing ones are ignored),
+    and only those are read from a Parquet snapshot.
+
+    The snapshot is parsed only the first time; later calls get a copy of
+    the registered table, so callers are free to modify what they receive.
+    """
+    if name not in RAW_TABLES:
+        raise KeyError(f"Unknown raw table '{name}'")
+
+    if name in _REGISTRY:
+        df = _REGISTRY[name]
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+    else:
+        key = name if columns is None else (name, tuple(columns))
+        if key not in _REGISTRY:
+            _REGISTRY[key] = apply_schema(name, read_snapshot(raw_base_path(name), columns=columns))
+        df = _REGISTRY[key]
+
+    run_metrics.add(rows_in=len(df))
+    return df.copy()
+
+
+def register_raw(name: str, df: pd.DataFrame) -> bool:
+    """
+    Hand a freshly ingested list to the registry, so load_raw serves it
+    without reading its snapshot back from disk.
+
+    The frame is typed and converted through Arrow in memory, so transforms
+    get exactly what they would get from the Parquet snapshot. Without
+    pyarrow nothing is registered (returns False) and load_raw keeps
+    reading the snapshot files.
+    """
+    if name not in RAW_TABLES:
+        raise KeyError(f"Unknown raw table '{name}'")
+    if not HAS_PYARROW:
+        return False
+    import pyarrow as pa
+
+    typed = apply_schema(name, df.copy())
+    table = pa.Table.from_pandas(_arrow_safe(typed), preserve_index=False)
+
+    for key in [k for k in _REGISTRY if k == name or (isinstance(k, tuple) and k[0] == name)]:
+        del _REGISTRY[key]
+    _REGISTRY[name] = table.to_pandas()
+    return True
+
+
+def clear_raw_cache() -> None:
+    """Forget every loaded table (e.g. after job1 wrote new snapshots)."""
+    _REGISTRY.clear()
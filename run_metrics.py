@@ -0,0 +1,220 @@
+# redskins_dashboard/jobs/run_metrics.py
+#
+# Structured metrics of a run of the jobs: one JSON line per run in
+# data/metrics/runs.jsonl and, optionally, a Prometheus textfile (for the
+# node_exporter textfile collector) with the same numbers as gauges.
+#
+# Per stage (job1 ... job4):
+#   elapsed_s, status        wall time, "ok" or "error"
+#   rows_in, rows_out        items received from Graph / raw table rows
+#                            loaded; rows of the snapshots / views written
+#   bytes_read, bytes_written
+#                            local files read and written
+#   peak_rss_bytes           process peak RSS (worker processes included)
+#                            when the stage finished
+#   http_*                   Graph requests, retries, throttled responses
+#                            and bytes sent / received (graph_http.stats)
+#
+# The jobs report rows and bytes with add(), which counts for the stage
+# running in the current context (threads started by a stage must run
+# their work in a copy of its context; add() is a no-op outside a stage).
+# Stages that run side by side share the process-wide numbers (RSS, HTTP):
+# in the pipeline only job1 and job3 talk to Graph, and never together.
+
+import os
+import sys
+import json
+import time
+import uuid
+import platform
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from redskins_dashboard.jobs import graph_http
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+METRICS_PATH = os.environ.get("RUN_METRICS_PATH", os.path.join(DATA_DIR, "metrics", "runs.jsonl"))
+# Prometheus textfile to (over)write after every run, if set
+PROMETHEUS_TEXTFILE = os.environ.get("RUN_METRICS_PROMETHEUS_FILE") or None
+
+PROMETHEUS_PREFIX = "redskins_jobs"
+
+COUNTERS = ("rows_in", "rows_out", "bytes_read", "bytes_written")
+HTTP_COUNTERS = ("requests", "retries", "throttled", "bytes_sent", "bytes_received")
+
+# (counters, lock) of the stage running in the current context; the lock
+# guards the counters against the stage's own worker threads.
+_current: ContextVar = ContextVar("run_metrics_stage", default=None)
+
+
+def add(**counts) -> None:
+    """Add to the counters (COUNTERS) of the stage running in this context."""
+    current = _current.get()
+    if current is None:
+        return
+    counters, lock = current
+    with lock:
+        for key, n in counts.items():
+            counters[key] += int(n)
+
+
+def file_size(path) -> int:
+    """Size of a file, 0 if it does not exist."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+@contextmanager
+def collect():
+    """Collect what add() reports inside the block into a fresh counter dict."""
+    counters = dict.fromkeys(COUNTERS, 0)
+    token = _current.set((counters, threading.Lock()))
+    try:
+        yield counters
+    finally:
+        _current.reset(token)
+
+
+def peak_rss_bytes():
+    """Peak RSS of this process or of its finished worker processes, None if unknown."""
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class Run:
+    """Metrics of one run: stages are recorded with `with run.stage(name):`."""
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = _utc_now()
+        self._start = time.perf_counter()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        http_before = graph_http.stats()
+        start = time.perf_counter()
+        status = "error"
+        with collect() as counters:
+            try:
+                yield counters
+                status = "ok"
+            finally:
+                http_after = graph_http.stats()
+                self.stages[name] = {
+                    "status": status,
+                    "elapsed_s": round(time.perf_counter() - start, 3),
+                    **counters,
+                    "peak_rss_bytes": peak_rss_bytes(),
+                    **{
+                        f"http_{key}": http_after[key] - http_before[key]
+                        for key in HTTP_COUNTERS
+                    },
+                }
+
+    def record(self) -> dict:
+        ok = all(stage["status"] == "ok" for stage in self.stages.values())
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "finished_at": _utc_now(),
+            "elapsed_s": round(time.perf_counter() - self._start, 3),
+            "status": "ok" if ok else "error",
+            "host": platform.node(),
+            "stages": self.stages,
+        }
+
+    def write(self, path: str = METRICS_PATH, prometheus_path: str = PROMETHEUS_TEXTFILE) -> dict:
+        """Append the run record to the JSON-lines file (and export it); returns it."""
+        record = self.record()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        if prometheus_path:
+            write_prometheus_textfile(record, prometheus_path)
+        return record
+
+
+@contextmanager
+def tracked_run(stage_name: str, path: str = METRICS_PATH,
+                prometheus_path: str = PROMETHEUS_TEXTFILE):
+    """A one-stage run (a job started on its own), written even if it fails."""
+    run = Run()
+    try:
+        with run.stage(stage_name):
+            yield run
+    finally:
+        run.write(path, prometheus_path)
+
+
+def write_prometheus_textfile(record: dict, path: str) -> None:
+    """
+    Write a run record as Prometheus gauges, replacing the file atomically
+    (the textfile collector must never see a half-written file).
+    """
+    stage_metrics = [
+        ("elapsed_s", "stage_duration_seconds", "Wall time of the stage"),
+        ("rows_in", "stage_rows_in", "Rows received or loaded by the stage"),
+        ("rows_out", "stage_rows_out", "Rows written by the stage"),
+        ("bytes_read", "stage_bytes_read", "Bytes of local files read by the stage"),
+        ("bytes_written", "stage_bytes_written", "Bytes of local files written by the stage"),
+        ("peak_rss_bytes", "stage_peak_rss_bytes", "Process peak RSS at the end of the stage"),
+        ("http_requests", "stage_http_requests", "Graph requests sent by the stage"),
+        ("http_retries", "stage_http_retries", "Graph requests retried by the stage"),
+        ("http_throttled", "stage_http_throttled", "Throttled Graph responses during the stage"),
+        ("http_bytes_sent", "stage_http_bytes_sent", "Bytes uploaded to Graph by the stage"),
+        ("http_bytes_received", "stage_http_bytes_received", "Bytes received from Graph by the stage"),
+    ]
+
+    lines = []
+    for key, metric, help_text in stage_metrics:
+        name = f"{PROMETHEUS_PREFIX}_{metric}"
+        lines += [f"# HELP {name} {help_text}.", f"# TYPE {name} gauge"]
+        for stage, values in record["stages"].items():
+            if values.get(key) is not None:
+                lines.append(f'{name}{{stage="{stage}"}} {values[key]}')
+
+    name = f"{PROMETHEUS_PREFIX}_stage_success"
+    lines += [f"# HELP {name} 1 if the stage succeeded in the last run.", f"# TYPE {name} gauge"]
+    for stage, values in record["stages"].items():
+        lines.append(f'{name}{{stage="{stage}"}} {int(values["status"] == "ok")}')
+
+    finished = datetime.fromisoformat(record["finished_at"]).timestamp()
+    lines += [
+        f"# HELP {PROMETHEUS_PREFIX}_run_success 1 if every stage of the last run succeeded.",
+        f"# TYPE {PROMETHEUS_PREFIX}_run_success gauge",
+        f"{PROMETHEUS_PREFIX}_run_success {int(record['status'] == 'ok')}",
+        f"# HELP {PROMETHEUS_PREFIX}_run_duration_seconds Wall time of the last run.",
+        f"# TYPE {PROMETHEUS_PREFIX}_run_duration_seconds gauge",
+        f"{PROMETHEUS_PREFIX}_run_duration_seconds {record['elapsed_s']}",
+        f"# HELP {PROMETHEUS_PREFIX}_run_last_timestamp_seconds End of the last run (Unix time).",
+        f"# TYPE {PROMETHEUS_PREFIX}_run_last_timestamp_seconds gauge",
+        f"{PROMETHEUS_PREFIX}_run_last_timestamp_seconds {finished:.0f}",
+    ]
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
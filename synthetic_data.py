@@ -0,0 +1,156 @@
+# redskins_dashboard/jobs/synthetic_data.py
+#
+# Seeded generator of raw SharePoint snapshots (jugadores, creditos, cobros,
+# categorias) shaped like the ones job1 writes, for benchmarks and local
+# runs without SharePoint access. The same seed and scale always produce
+# the same files.
+#
+# Proportions follow a typical club: about one credito per 10 cobros and
+# two jugadores per three creditos. Like the real lists, a few cobros have
+# no idCredito, no fecha or no monto, and apertura uses the truncated
+# 'YYYY-MM-DDT07:00:' form.
+#
+#   python -m redskins_dashboard.jobs.synthetic_data OUT_DIR [--cobros N] [--seed S]
+
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+from redskins_dashboard.jobs.raw_tables import RAW_TABLES
+
+CATEGORIAS = ["Sub-8", "Sub-10", "Sub-12", "Sub-14", "Sub-16", "Sub-18"]
+ARTICULOS = ["Cuota", "Camiseta", "Botines", "Indumentaria", "Viaje"]
+ADMINISTRADORES = ["a@x.com", "b@x.com", "c@x.com"]
+DIAS = ["Lunes", "Martes", "Miercoles", "Jueves", "Viernes"]
+CANT_CUOTAS = [1, 2, 3, 4, 6, 8, 10, 12]
+MONTOS_FINANCIADOS = [1000.0, 2500.0, 5000.0, 7500.0, 10000.0, 15000.0]
+
+SEASON_START = pd.Timestamp("2025-03-01")
+CREATED = "2025-08-01T10:11:12Z"
+MODIFIED = "2025-09-01T10:11:12Z"
+
+# share of cobros with a missing value, like the real list
+MISSING_RATE = 0.01
+
+
+def _iso(ts: pd.Series) -> pd.Series:
+    """Graph dateTime strings: 'YYYY-MM-DDTHH:MM:SSZ'."""
+    return ts.dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _with_missing(rng: np.random.Generator, s: pd.Series, rate: float) -> pd.Series:
+    return s.mask(rng.random(len(s)) < rate)
+
+
+def generate_tables(n_cobros: int, seed: int = 0) -> dict:
+    """The four raw tables as DataFrames, keyed by raw table name."""
+    rng = np.random.default_rng(seed)
+    n_creditos = max(1, n_cobros // 10)
+    n_jugadores = max(1, n_creditos * 2 // 3)
+
+    # --- categorias ---
+    categorias = pd.DataFrame({
+        "id": np.arange(1, len(CATEGORIAS) + 1),
+        "Title": CATEGORIAS,
+        "Created": CREATED,
+        "Modified": CREATED,
+        "_ComplianceTagWrittenTime": None,
+        "Item Type": "Item",
+        "Path": "Lists/Categorias",
+    })
+
+    # --- jugadores ---
+    jug_ids = np.arange(1, n_jugadores + 1)
+    apertura = SEASON_START + pd.to_timedelta(rng.integers(0, 60, n_jugadores), unit="D")
+    jugadores = pd.DataFrame({
+        "id": jug_ids,
+        "Title": [f"Jugador {i}" for i in jug_ids],
+        "categoria": rng.choice(CATEGORIAS, n_jugadores),
+        "edad": rng.integers(6, 18, n_jugadores).astype("float64"),
+        "nombrePadreTutor": [f"Tutor {i}" for i in jug_ids],
+        "apertura": apertura.strftime("%Y-%m-%dT07:00:"),
+        "cierre": None,
+        "Created": CREATED,
+        "Modified": MODIFIED,
+    })
+
+    # --- creditos ---
+    cred_ids = np.arange(1, n_creditos + 1)
+    id_jugador = rng.integers(1, n_jugadores + 1, n_creditos)
+    cant_cuotas = rng.choice(CANT_CUOTAS, n_creditos)
+    financiado = rng.choice(MONTOS_FINANCIADOS, n_creditos)
+    inicio = SEASON_START + pd.to_timedelta(rng.integers(0, 240, n_creditos), unit="D")
+    inicio = pd.Series(inicio + pd.Timedelta(hours=7))
+    creditos = pd.DataFrame({
+        "id": cred_ids,
+        "idJugador": id_jugador,
+        "Title": "Credito",
+        "nombreJugador": jugadores["Title"].to_numpy()[id_jugador - 1],
+        "articulos": rng.choice(ARTICULOS, n_creditos),
+        "montoFinanciado": financiado,
+        "cantCuotas": cant_cuotas.astype("float64"),
+        "montoCuota": np.round(financiado * 1.2 / cant_cuotas, 2),
+        "emailAdministrador": rng.choice(ADMINISTRADORES, n_creditos),
+        "fechaInicioTemp": _iso(inicio),
+        "diaDeCobro": rng.choice(DIAS, n_creditos),
+        "finalizado": rng.random(n_creditos) < 0.3,
+        "Item Type": "Item",
+        "Path": "Lists/Creditos",
+    })
+
+    # --- cobros: spread over each credit's cuotas, plus some late payments ---
+    pos = rng.integers(0, n_creditos, n_cobros)
+    plazo = cant_cuotas[pos] * 21 + 30
+    fecha = (
+        inicio.to_numpy()[pos]
+        + pd.to_timedelta((rng.random(n_cobros) * plazo).astype("int64"), unit="D")
+        - pd.Timedelta(hours=4)
+    )
+    monto_cuota = creditos["montoCuota"].to_numpy()[pos]
+    cobros = pd.DataFrame({
+        "id": np.arange(1, n_cobros + 1),
+        "idCredito": _with_missing(rng, pd.Series(cred_ids[pos], dtype="Int64"), 2 * MISSING_RATE),
+        "montoCuota": monto_cuota,
+        "montoCobrado": _with_missing(
+            rng, pd.Series(np.round(monto_cuota * rng.uniform(0.3, 1.2, n_cobros), 2)), MISSING_RATE
+        ),
+        "latitud": np.round(-34.6 + rng.normal(0, 0.05, n_cobros), 4),
+        "longitud": np.round(-58.4 + rng.normal(0, 0.05, n_cobros), 4),
+        "fechaCobro": _with_missing(rng, _iso(pd.Series(fecha)), MISSING_RATE),
+        "emailAdministrador": rng.choice(ADMINISTRADORES, n_cobros),
+        "firmaConformidad": "si",
+        "Created": CREATED,
+    })
+
+    return {
+        "jugadores": jugadores,
+        "creditos": creditos,
+        "cobros": cobros,
+        "categorias": categorias,
+    }
+
+
+def generate(out_dir: str, n_cobros: int, seed: int = 0) -> dict:
+    """
+    Write the four raw CSV snapshots (jugadores_raw.csv, ...) for a club
+    with n_cobros cobros into out_dir. Returns {table name: path}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {}
+    for name, df in generate_tables(n_cobros, seed).items():
+        path = os.path.join(out_dir, RAW_TABLES[name]["file"])
+        df.to_csv(path, index=False)
+        paths[name] = path
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic raw SharePoint snapshots.")
+    parser.add_argument("out_dir", help="directory for the *_raw.csv files")
+    parser.add_argument("--cobros", type=int, default=10_000, help="number of cobros (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: %(default)s)")
+    args = parser.parse_args()
+
+    for name, path in generate(args.out_dir, args.cobros, args.seed).items():
+        print(f"✔ {name} written to {path}")
@@ -0,0 +1,88 @@
+# redskins_dashboard/jobs/tests/test_estado_incremental.py
+#
+# The incremental estado_general must give exactly what a full rebuild
+# gives: after edits to cobros and creditos, and when the as-of date moves.
+#
+#   python -m pytest redskins_dashboard/jobs/tests
+
+import pandas as pd
+import pytest
+
+from redskins_dashboard.jobs import job2_transform_local as job2
+from redskins_dashboard.jobs.raw_tables import apply_schema
+from redskins_dashboard.jobs.synthetic_data import generate_tables
+
+HOY = pd.Timestamp("2025-11-02")
+
+# a player whose last cuota ends 13 days after HOY, with the first two paid
+# on time: AL CORRIENTE as of HOY, MOROSO once that cuota is over
+JUGADOR_AL_DIA = 1_000_000
+
+
+@pytest.fixture
+def raw(tmp_path, monkeypatch):
+    """Typed synthetic creditos / cobros, renamed like transform_estado_general does."""
+    monkeypatch.setattr(job2, "ESTADO_STATE_PATH", str(tmp_path / "estado_general_state.pkl"))
+    tables = generate_tables(3000, seed=7)
+    inicio = HOY - pd.Timedelta(days=50)
+    tables["creditos"] = pd.concat([tables["creditos"], pd.DataFrame({
+        "id": [JUGADOR_AL_DIA], "idJugador": [JUGADOR_AL_DIA], "nombreJugador": ["Al Dia"],
+        "cantCuotas": [3.0], "montoCuota": [100.0], "fechaInicioTemp": [f"{inicio:%Y-%m-%d}T07:00:00Z"],
+    })], ignore_index=True)
+    tables["cobros"] = pd.concat([tables["cobros"], pd.DataFrame({
+        "id": [JUGADOR_AL_DIA, JUGADOR_AL_DIA + 1], "idCredito": [JUGADOR_AL_DIA] * 2,
+        "montoCobrado": [100.0, 100.0],
+        "fechaCobro": [f"{inicio + pd.Timedelta(days=d):%Y-%m-%d}T12:00:00Z" for d in (10, 30)],
+    })], ignore_index=True)
+
+    creditos = apply_schema("creditos", tables["creditos"])[job2.ESTADO_CREDITO_COLS[1:] + ["id"]]
+    cobros = apply_schema("cobros", tables["cobros"])[job2.ESTADO_COBRO_COLS[1:] + ["id"]]
+    return creditos.rename(columns={"id": "ID"}), cobros.rename(columns={"id": "ID"})
+
+
+def _assert_same_as_full_rebuild(creditos, cobros, hoy, capsys) -> pd.DataFrame:
+    incremental = job2._estado_general_incremental(creditos, cobros, hoy)
+    assert "recomputed" in capsys.readouterr().out
+    pd.testing.assert_frame_equal(incremental, job2._estado_general(creditos, cobros, hoy))
+    return incremental
+
+
+def _estado_al_dia(df_estado: pd.DataFrame) -> str:
+    return df_estado.loc[df_estado["idJugador"] == JUGADOR_AL_DIA, "estadoGeneral"].item()
+
+
+def test_incremental_after_edits_matches_full_rebuild(raw, capsys):
+    creditos, cobros = raw
+    job2._estado_general_incremental(creditos, cobros, HOY)
+
+    cobros = cobros.copy()
+    cobros.loc[3, "montoCobrado"] = 99999.0                 # changed monto
+    cobros.loc[4, "fechaCobro"] = pd.Timestamp("2025-12-31")  # moved to another cuota
+    cobros = cobros.drop(index=[7, 8])                        # deleted cobros
+    cobros = pd.concat(                                       # new cobro
+        [cobros, cobros.iloc[[0]].assign(ID=10_000_000)], ignore_index=True,
+    )
+    cobros = cobros.iloc[[1, 0] + list(range(2, len(cobros)))]  # reordered rows
+
+    creditos = creditos.copy()
+    creditos.loc[10, "montoCuota"] += 1                      # changed credito
+    creditos.loc[5, "idJugador"] = creditos.loc[6, "idJugador"]  # credito moved to another player
+    creditos = creditos.drop(index=20)                        # deleted credito
+    creditos = pd.concat(                                     # new credito of an existing player
+        [creditos, creditos.iloc[[0]].assign(ID=10_000_000, cantCuotas=3.0)], ignore_index=True,
+    )
+
+    _assert_same_as_full_rebuild(creditos, cobros, HOY, capsys)
+    # and again on the state that run saved
+    _assert_same_as_full_rebuild(creditos, cobros.drop(index=[11]), HOY, capsys)
+
+
+@pytest.mark.parametrize("desde, hasta", [(0, 21), (0, 90), (21, 0), (90, -45)])
+def test_incremental_after_as_of_change_matches_full_rebuild(raw, capsys, desde, hasta):
+    creditos, cobros = raw
+    antes = job2._estado_general_incremental(creditos, cobros, HOY + pd.Timedelta(days=desde))
+    capsys.readouterr()
+
+    despues = _assert_same_as_full_rebuild(creditos, cobros, HOY + pd.Timedelta(days=hasta), capsys)
+    # the cached row of that player is stale: it must have been recomputed
+    assert _estado_al_dia(antes) != _estado_al_dia(despues)
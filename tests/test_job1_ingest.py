@@ -0,0 +1,209 @@
+# redskins_dashboard/jobs/tests/test_job1_ingest.py
+#
+# job1 against a local stand-in Graph server (ThreadingHTTPServer): paging,
+# full refresh, delta merge and the fallback when a delta link expired.
+#
+#   python -m pytest redskins_dashboard/jobs/tests
+
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pytest
+
+from redskins_dashboard.jobs import job1_ingest_from_sharepoint as job1
+from redskins_dashboard.jobs import raw_tables
+
+SITE_ID = "site-1"
+LISTS = [("Jugadores", "jugadores"), ("Cobros", "cobros")]
+
+
+class FakeGraph:
+    """Lists, their change log and the requests received, behind a Graph-like HTTP API."""
+
+    PAGE_SIZE = 2
+
+    def __init__(self, lists: dict):
+        # list id -> {item id: fields}
+        self.lists = {name.lower(): dict(items) for name, items in lists.items()}
+        self.version = 0
+        self.changes = []        # (version, list id, delta item)
+        self.expired_before = 0  # delta tokens older than this get a 410
+        self.requests = []       # (path and query, Authorization header)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1.0"
+
+    def change(self, list_id: str, item_id: int, **fields):
+        with self._lock:
+            self.version += 1
+            self.lists[list_id][item_id] = fields
+            self.changes.append((self.version, list_id, self._item(item_id, fields)))
+
+    def delete(self, list_id: str, item_id: int):
+        with self._lock:
+            self.version += 1
+            del self.lists[list_id][item_id]
+            self.changes.append((self.version, list_id, {"id": str(item_id), "deleted": {"state": "deleted"}}))
+
+    def expire_delta_links(self):
+        self.expired_before = self.version + 1
+
+    def item_requests(self) -> list:
+        return [path for path, _ in self.requests if urlsplit(path).path.endswith("/items")]
+
+    @staticmethod
+    def _item(item_id: int, fields: dict) -> dict:
+        return {"id": str(item_id), "fields": {"id": str(item_id), **fields}}
+
+    def _route(self, path: str, query: dict):
+        parts = path.split("/")[2:]  # after /v1.0
+        if parts[0] == "sites" and parts[1].endswith(":"):
+            # site by path: /sites/{host}:/sites/{site path}
+            return 200, {"id": SITE_ID}
+        if parts[:3] != ["sites", SITE_ID, "lists"]:
+            return 404, {"error": path}
+        list_id = parts[3].lower()
+        if list_id not in self.lists:
+            return 404, {"error": f"list {list_id}"}
+        if len(parts) == 4:
+            return 200, {"id": list_id}
+
+        base = f"{self.url}/sites/{SITE_ID}/lists/{list_id}/items"
+        if parts[4:] == ["items"]:
+            items = sorted(self.lists[list_id].items())
+            skip = int(query.get("$skiptoken", "0"))
+            payload = {"value": [self._item(i, f) for i, f in items[skip:skip + self.PAGE_SIZE]]}
+            if skip + self.PAGE_SIZE < len(items):
+                payload["@odata.nextLink"] = f"{base}?expand=fields&$skiptoken={skip + self.PAGE_SIZE}"
+            return 200, payload
+        if parts[4:] == ["items", "delta"]:
+            token = query["token"]
+            if token != "latest" and int(token) < self.expired_before:
+                return 410, {"error": {"code": "resyncRequired"}}
+            since = self.version if token == "latest" else int(token)
+            return 200, {
+                "value": [item for v, lid, item in self.changes if v > since and lid == list_id],
+                "@odata.deltaLink": f"{base}/delta?token={self.version}",
+            }
+        return 404, {"error": path}
+
+    def _handler(self):
+        graph = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                with graph._lock:
+                    graph.requests.append((self.path, self.headers.get("Authorization")))
+                    status, payload = graph._route(unquote(url.path), query)
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def graph(tmp_path, monkeypatch):
+    fake = FakeGraph({
+        "Jugadores": {i: {"Title": f"Jugador {i}", "categoria": "Sub-10"} for i in range(1, 6)},
+        "Cobros": {
+            i: {"idCredito": str(10 + i), "montoCobrado": 100.0 * i, "fechaCobro": f"2025-10-0{i}T07:00:00Z"}
+            for i in range(1, 6)
+        },
+    })
+    threading.Thread(target=fake.server.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(job1, "GRAPH", fake.url)
+    monkeypatch.setattr(job1, "RAW_DIR", str(tmp_path / "raw"))
+    monkeypatch.setattr(job1, "STATE_DIR", str(tmp_path / "state"))
+    monkeypatch.setattr(raw_tables, "RAW_DIR", str(tmp_path / "raw"))
+    (tmp_path / "raw").mkdir()
+    (tmp_path / "state").mkdir()
+    raw_tables.clear_raw_cache()
+    yield fake
+    raw_tables.clear_raw_cache()
+    fake.server.shutdown()
+    fake.server.server_close()
+
+
+def _snapshot(table: str):
+    raw_tables.clear_raw_cache()
+    return raw_tables.load_raw(table).sort_values("id").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("keep", [True, False])
+def test_full_refresh_reads_every_page(graph, keep):
+    frames = job1.ingest_lists(SITE_ID, "token", LISTS, full_refresh=True, keep=keep)
+
+    # 5 items, 2 per page
+    assert len(graph.item_requests()) == 2 * 3
+    assert sorted(frames) == (["cobros", "jugadores"] if keep else [])
+
+    cobros = _snapshot("cobros")
+    assert cobros["id"].tolist() == [1, 2, 3, 4, 5]
+    assert cobros["idCredito"].tolist() == [11, 12, 13, 14, 15]
+    assert cobros["montoCobrado"].tolist() == [100.0, 200.0, 300.0, 400.0, 500.0]
+    assert _snapshot("jugadores")["Title"].tolist() == [f"Jugador {i}" for i in range(1, 6)]
+    # jugadores is uploaded by job3, so it also gets a CSV
+    assert os.path.exists(os.path.join(job1.RAW_DIR, "jugadores_raw.csv"))
+
+
+def test_delta_merges_changes(graph):
+    job1.ingest_lists(SITE_ID, "token", LISTS, full_refresh=True)
+    listed = len(graph.item_requests())
+
+    graph.change("cobros", 2, idCredito="12", montoCobrado=999.0, fechaCobro="2025-10-02T07:00:00Z")
+    graph.delete("cobros", 3)
+    graph.change("cobros", 6, idCredito="16", montoCobrado=600.0, fechaCobro="2025-10-06T07:00:00Z")
+    graph.change("jugadores", 1, Title="Jugador Uno", categoria="Sub-12")
+
+    job1.ingest_lists(SITE_ID, "token", LISTS)
+
+    # only the delta links were read, not the lists
+    assert len(graph.item_requests()) == listed
+    cobros = _snapshot("cobros")
+    assert cobros["id"].tolist() == [1, 2, 4, 5, 6]
+    assert cobros["montoCobrado"].tolist() == [100.0, 999.0, 400.0, 500.0, 600.0]
+    jugadores = _snapshot("jugadores")
+    assert jugadores["Title"].tolist() == ["Jugador Uno"] + [f"Jugador {i}" for i in range(2, 6)]
+
+    # nothing changed since: the snapshots stay as they are
+    job1.ingest_lists(SITE_ID, "token", LISTS)
+    assert _snapshot("cobros")["id"].tolist() == [1, 2, 4, 5, 6]
+
+
+def test_expired_delta_link_falls_back_to_full_refresh(graph):
+    job1.ingest_lists(SITE_ID, "token", LISTS, full_refresh=True)
+    graph.delete("cobros", 5)
+    graph.expire_delta_links()
+    listed = len(graph.item_requests())
+
+    job1.ingest_lists(SITE_ID, "token", LISTS)
+
+    assert len(graph.item_requests()) > listed
+    assert _snapshot("cobros")["id"].tolist() == [1, 2, 3, 4]
+
+
+def test_main_uses_the_given_token_and_graph_for_the_site(graph, monkeypatch):
+    def no_app_token():
+        raise AssertionError("main() asked for an app token")
+
+    monkeypatch.setattr(job1, "get_app_token", no_app_token)
+    monkeypatch.setattr(job1, "RAW_LISTS", LISTS)
+
+    job1.main(full_refresh=True, token="injected")
+
+    assert graph.requests
+    assert {auth for _, auth in graph.requests} == {"Bearer injected"}
+    assert _snapshot("jugadores")["id"].tolist() == [1, 2, 3, 4, 5]